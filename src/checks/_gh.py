@@ -0,0 +1,49 @@
+"""GitHub issue creation shared by the irregularity checks."""
+
+import logging
+import subprocess
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+ISSUE_LABEL = "data-irregularity"
+GH_ISSUE_CREATE = ("gh", "issue", "create")
+
+
+def create_github_issue(title: str, body: str, dry_run: bool = False) -> bool:
+    """Create a GitHub issue using gh CLI.
+
+    The body is passed through a temporary file rather than argv, so long
+    reports cannot hit the OS argument-size limit.
+
+    Args:
+        title: Issue title
+        body: Issue body
+        dry_run: If True, only log what would be created
+
+    Returns:
+        True if issue created successfully
+    """
+    if dry_run:
+        logger.info(f"[DRY RUN] Would create issue: {title}")
+        logger.info(f"[DRY RUN] Body:\n{body}")
+        return True
+
+    with tempfile.NamedTemporaryFile("w", suffix=".md", encoding="utf-8") as body_file:
+        body_file.write(body)
+        body_file.flush()
+        try:
+            result = subprocess.run(
+                [*GH_ISSUE_CREATE, "--title", title, "--body-file", body_file.name, "--label", ISSUE_LABEL],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            logger.info(f"Created issue: {result.stdout.strip()}")
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to create issue: {e.stderr}")
+            return False
+        except FileNotFoundError:
+            logger.error("gh CLI not found. Install GitHub CLI to create issues.")
+            return False
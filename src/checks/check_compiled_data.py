@@ -3,89 +3,206 @@
 
 import argparse
 import logging
-import subprocess
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 
+# Allow `from checks._gh import ...` when running this file as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from checks._gh import create_github_issue  # noqa: E402
+
 TIMEZONE = ZoneInfo("Europe/Berlin")
 HISTORICAL_DAYS = 30
 EXTENDED_ZERO_THRESHOLD_HOURS = 8
 DAYTIME_START_HOUR = 6
 DAYTIME_END_HOUR = 22
+RECENT_WINDOW_HOURS = 48
+CSV_CHUNK_SIZE = 200_000
+
+# Columns the checks actually read; everything else in the CSV is skipped at parse time
+HISTORICAL_COLUMNS = ["timestamp", "facility_type", "facility_name", "occupancy_percent", "hour"]
+HISTORICAL_DTYPES = {
+    "facility_type": "category",
+    "facility_name": "category",
+    "occupancy_percent": "float32",
+    "hour": "int8",
+}
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
-def load_historical_data(csv_path: Path) -> pd.DataFrame:
+def berlin_cutoff(window: timedelta, now: datetime | None = None) -> datetime:
+    """Get the start of a look-back window as naive Berlin wall-clock time.
+
+    Args:
+        window: Length of the look-back window
+        now: Reference time (default: current Berlin time)
+
+    Returns:
+        Naive datetime comparable with the loaded timestamp column
+    """
+    now = now or datetime.now(TIMEZONE)
+    return (now - window).replace(tzinfo=None)
+
+
+def rows_since(df: pd.DataFrame, cutoff: datetime) -> pd.DataFrame:
+    """Get rows with timestamp at or after cutoff.
+
+    Uses a binary search when the timestamp column is sorted (as returned by
+    load_historical_data) and falls back to a boolean mask otherwise.
+
+    Args:
+        df: DataFrame with a naive timestamp column
+        cutoff: Naive Berlin wall-clock cutoff
+
+    Returns:
+        Slice of df at or after cutoff
+    """
+    timestamps = df["timestamp"]
+    if timestamps.is_monotonic_increasing:
+        return df.iloc[timestamps.searchsorted(cutoff):]
+    return df[timestamps >= cutoff]
+
+
+def _read_csv_window(csv_path: Path, columns: list[str], dtype: dict, cutoff: datetime) -> pd.DataFrame:
+    """Stream the CSV in chunks, keeping only rows at or after cutoff."""
+    chunks = []
+    reader = pd.read_csv(
+        csv_path, usecols=columns, dtype=dtype, engine="c", cache_dates=True, chunksize=CSV_CHUNK_SIZE
+    )
+    for chunk in reader:
+        # Parse via UTC to handle mixed offsets (CET +01:00 / CEST +02:00)
+        chunk["timestamp"] = pd.to_datetime(chunk["timestamp"], utc=True)
+        # Convert to Berlin local time, then strip the zone so checks compare naive wall-clock times
+        chunk["timestamp"] = chunk["timestamp"].dt.tz_convert("Europe/Berlin").dt.tz_localize(None)
+        chunks.append(chunk[chunk["timestamp"] >= cutoff])
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _read_parquet_window(parquet_path: Path, columns: list[str], dtype: dict, cutoff: datetime) -> pd.DataFrame:
+    """Read a Parquet export, pushing the cutoff down so old row groups are skipped.
+
+    Expects a tz-aware timestamp column; requires pyarrow.
+    """
+    df = pd.read_parquet(
+        parquet_path,
+        columns=columns,
+        filters=[("timestamp", ">=", pd.Timestamp(cutoff, tz=TIMEZONE))],
+    )
+    df["timestamp"] = df["timestamp"].dt.tz_convert("Europe/Berlin").dt.tz_localize(None)
+    return df.astype(dtype)
+
+
+def load_historical_data(
+    data_path: Path,
+    columns: list[str] | None = None,
+    days: int = HISTORICAL_DAYS,
+) -> pd.DataFrame:
     """Load occupancy historical data.
 
+    Only rows inside the widest check window are kept. A CSV is streamed in
+    chunks and filtered per chunk, so peak memory tracks the window, not the
+    file; a .parquet file gets the window as a reader filter instead.
+
     Args:
-        csv_path: Path to occupancy_historical.csv
+        data_path: Path to occupancy_historical.csv (or a .parquet export)
+        columns: Columns to read (default: HISTORICAL_COLUMNS)
+        days: Number of days of history to keep
 
     Returns:
-        DataFrame with parsed timestamps
+        DataFrame with timestamps as naive Berlin local time
     """
-    df = pd.read_csv(csv_path)
-    # Parse via UTC to handle mixed offsets (CET +01:00 / CEST +02:00)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
-    # Convert to Berlin local time for comparisons
-    df["timestamp"] = df["timestamp"].dt.tz_convert("Europe/Berlin")
+    if columns is None:
+        columns = HISTORICAL_COLUMNS
+    dtype = {col: t for col, t in HISTORICAL_DTYPES.items() if col in columns}
+    cutoff = berlin_cutoff(max(timedelta(days=days), timedelta(hours=RECENT_WINDOW_HOURS)))
+
+    if Path(data_path).suffix == ".parquet":
+        df = _read_parquet_window(data_path, columns, dtype, cutoff)
+    else:
+        df = _read_csv_window(data_path, columns, dtype, cutoff)
+
+    # Sorted timestamps let rows_since() binary-search instead of scanning
+    df = df.sort_values("timestamp", kind="mergesort", ignore_index=True)
+    # CSV chunks carry their own categories; concat falls back to object when they differ
+    for col, t in dtype.items():
+        if t == "category":
+            df[col] = df[col].astype("category")
     return df
 
 
-def get_historical_facility_types(df: pd.DataFrame, days: int = HISTORICAL_DAYS) -> set[str]:
+def _unique_values(series: pd.Series) -> set[str]:
+    """Get distinct values of a column, via category codes when categorical."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = np.unique(series.cat.codes.to_numpy())
+        codes = codes[codes >= 0]  # -1 marks missing values
+        return set(series.cat.categories.take(codes))
+    return set(series.unique())
+
+
+def get_historical_facility_types(
+    df: pd.DataFrame,
+    days: int = HISTORICAL_DAYS,
+    now: datetime | None = None
+) -> set[str]:
     """Get set of facility types seen in historical data.
 
     Args:
         df: Historical data DataFrame
         days: Number of days to look back (from today, not from latest data)
+        now: Reference time (default: current Berlin time)
 
     Returns:
         Set of facility type strings
     """
-    cutoff = datetime.now(TIMEZONE) - timedelta(days=days)
-    historical = df[df["timestamp"] >= cutoff]
+    cutoff = berlin_cutoff(timedelta(days=days), now)
+    historical = rows_since(df, cutoff)
 
-    return set(historical["facility_type"].unique())
+    return _unique_values(historical["facility_type"])
 
 
-def get_recent_facility_types(df: pd.DataFrame, hours: int = 24) -> set[str]:
+def get_recent_facility_types(
+    df: pd.DataFrame,
+    hours: int = 24,
+    now: datetime | None = None
+) -> set[str]:
     """Get set of facility types seen in recent data.
 
     Args:
         df: Historical data DataFrame
         hours: Number of hours to look back
+        now: Reference time (default: current Berlin time)
 
     Returns:
         Set of facility type strings
     """
-    cutoff = datetime.now(TIMEZONE) - timedelta(hours=hours)
-    recent = df[df["timestamp"] >= cutoff]
-    return set(recent["facility_type"].unique())
+    cutoff = berlin_cutoff(timedelta(hours=hours), now)
+    recent = rows_since(df, cutoff)
+    return _unique_values(recent["facility_type"])
 
 
 def check_new_facility_types(
     df: pd.DataFrame,
-    historical_types: set[str]
+    historical_types: set[str],
+    recent_types: set[str] | None = None
 ) -> list[str]:
     """Check for new facility types not in historical data.
 
     Args:
         df: Full DataFrame
         historical_types: Set of historical facility types
+        recent_types: Precomputed recent facility types (computed from df if omitted)
 
     Returns:
         List of issue descriptions
     """
-    recent_types = get_recent_facility_types(df)
+    if recent_types is None:
+        recent_types = get_recent_facility_types(df)
     new_types = recent_types - historical_types
 
     issues = []
@@ -97,18 +214,21 @@ def check_new_facility_types(
 
 def check_missing_facility_types(
     df: pd.DataFrame,
-    historical_types: set[str]
+    historical_types: set[str],
+    recent_types: set[str] | None = None
 ) -> list[str]:
     """Check for facility types that existed historically but are now missing.
 
     Args:
         df: Full DataFrame
         historical_types: Set of historical facility types
+        recent_types: Precomputed recent facility types (computed from df if omitted)
 
     Returns:
         List of issue descriptions
     """
-    recent_types = get_recent_facility_types(df)
+    if recent_types is None:
+        recent_types = get_recent_facility_types(df)
     missing_types = historical_types - recent_types
 
     issues = []
@@ -118,18 +238,19 @@ def check_missing_facility_types(
     return issues
 
 
-def check_invalid_occupancy(df: pd.DataFrame) -> list[str]:
+def check_invalid_occupancy(df: pd.DataFrame, now: datetime | None = None) -> list[str]:
     """Check for occupancy values > 100%.
 
     Args:
         df: Historical data DataFrame
+        now: Reference time (default: current Berlin time)
 
     Returns:
         List of issue descriptions
     """
     # Only check recent data (last 24 hours)
-    cutoff = datetime.now(TIMEZONE) - timedelta(hours=24)
-    recent = df[df["timestamp"] >= cutoff]
+    cutoff = berlin_cutoff(timedelta(hours=24), now)
+    recent = rows_since(df, cutoff)
     invalid = recent[recent["occupancy_percent"] > 100]
 
     issues = []
@@ -147,106 +268,77 @@ def check_invalid_occupancy(df: pd.DataFrame) -> list[str]:
 
 def check_extended_zero_occupancy(
     df: pd.DataFrame,
-    threshold_hours: int = EXTENDED_ZERO_THRESHOLD_HOURS
+    threshold_hours: int = EXTENDED_ZERO_THRESHOLD_HOURS,
+    now: datetime | None = None
 ) -> list[str]:
     """Check for facilities at 0% for extended periods during daytime.
 
     Only flags 0% occupancy during daytime hours (6:00-22:00) for threshold+ hours.
+    A run is a sequence of consecutive daytime readings that are all 0%; any
+    non-zero daytime reading ends it.
 
     Args:
         df: Historical data DataFrame
         threshold_hours: Minimum hours of continuous 0% to flag
+        now: Reference time (default: current Berlin time)
 
     Returns:
         List of issue descriptions
     """
     # Only check recent data (last 48 hours to capture extended periods)
-    cutoff = datetime.now(TIMEZONE) - timedelta(hours=48)
-    recent = df[df["timestamp"] >= cutoff].copy()
+    cutoff = berlin_cutoff(timedelta(hours=RECENT_WINDOW_HOURS), now)
+    recent = rows_since(df, cutoff)
 
     if recent.empty:
         return []
 
-    # Filter to daytime hours only
-    recent = recent[
+    # Filter to daytime hours only, ordered per facility for run detection
+    keys = ["facility_type", "facility_name"]
+    daytime = recent[
         (recent["hour"] >= DAYTIME_START_HOUR) &
         (recent["hour"] < DAYTIME_END_HOUR)
-    ]
-
-    issues = []
+    ].sort_values([*keys, "timestamp"], kind="mergesort")
 
-    # Group by facility and check for extended zeros
-    for (fac_type, fac_name), group in recent.groupby(["facility_type", "facility_name"]):
-        zero_records = group[group["occupancy_percent"] == 0]
-        if len(zero_records) == 0:
-            continue
-
-        # Check if zeros span threshold hours
-        zero_records = zero_records.sort_values("timestamp")
-        timestamps = zero_records["timestamp"].tolist()
-
-        if len(timestamps) < 2:
-            continue
-
-        # Simple check: if first and last zero are threshold+ hours apart
-        first_zero = timestamps[0]
-        last_zero = timestamps[-1]
-
-        # Handle timezone-aware vs naive
-        if hasattr(first_zero, "tzinfo") and first_zero.tzinfo is not None:
-            duration = last_zero - first_zero
-        else:
-            duration = pd.Timestamp(last_zero) - pd.Timestamp(first_zero)
-
-        if duration >= timedelta(hours=threshold_hours):
-            issues.append(
-                f"Extended zero occupancy: {fac_type}:{fac_name} "
-                f"at 0% for {duration} during daytime hours"
-            )
-
-    return issues
-
-
-def create_github_issue(title: str, body: str, dry_run: bool = False) -> bool:
-    """Create a GitHub issue using gh CLI.
-
-    Args:
-        title: Issue title
-        body: Issue body
-        dry_run: If True, only log what would be created
+    if daytime.empty:
+        return []
 
-    Returns:
-        True if issue created successfully
-    """
-    if dry_run:
-        logger.info(f"[DRY RUN] Would create issue: {title}")
-        logger.info(f"[DRY RUN] Body:\n{body}")
-        return True
-
-    try:
-        result = subprocess.run(
-            ["gh", "issue", "create", "--title", title, "--body", body, "--label", "data-irregularity"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        logger.info(f"Created issue: {result.stdout.strip()}")
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Failed to create issue: {e.stderr}")
-        return False
-    except FileNotFoundError:
-        logger.error("gh CLI not found. Install GitHub CLI to create issues.")
-        return False
+    # Label runs of consecutive readings: a new run starts whenever the
+    # facility changes or occupancy flips between zero and non-zero
+    is_zero = daytime["occupancy_percent"].to_numpy() == 0
+    facility_ids = daytime.groupby(keys, observed=True, sort=False).ngroup().to_numpy()
+    run_start = np.ones(len(daytime), dtype=bool)
+    run_start[1:] = (facility_ids[1:] != facility_ids[:-1]) | (is_zero[1:] != is_zero[:-1])
+    run_ids = np.cumsum(run_start)
+
+    # Span of every zero run, then the longest qualifying run per facility
+    zeros = daytime[is_zero].assign(run_id=run_ids[is_zero])
+    # observed=True skips unobserved category pairs; sort=False skips sorting every group
+    runs = zeros.groupby([*keys, "run_id"], observed=True, sort=False)["timestamp"].agg(["min", "max", "size"])
+    runs["duration"] = runs["max"] - runs["min"]
+    runs = runs[(runs["size"] >= 2) & (runs["duration"] >= timedelta(hours=threshold_hours))]
+    # Only the few flagged facilities are sorted, to keep issue order stable
+    longest = runs.groupby(level=keys, observed=True, sort=False)["duration"].max().sort_index()
+
+    return [
+        f"Extended zero occupancy: {fac_type}:{fac_name} "
+        f"at 0% for {duration} during daytime hours"
+        for (fac_type, fac_name), duration in longest.items()
+    ]
 
 
 def main():
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     parser = argparse.ArgumentParser(description="Check compiled data for irregularities")
     parser.add_argument(
         "--csv",
         type=str,
         default="datasets/occupancy_historical.csv",
-        help="Path to occupancy_historical.csv"
+        help="Path to occupancy_historical.csv (a .parquet export is also accepted)"
     )
     parser.add_argument(
         "--dry-run",
@@ -257,7 +349,7 @@ def main():
 
     csv_path = Path(args.csv)
     if not csv_path.exists():
-        logger.error(f"CSV file not found: {csv_path}")
+        logger.error(f"Data file not found: {csv_path}")
         sys.exit(1)
 
     today = datetime.now(TIMEZONE)
@@ -268,28 +360,32 @@ def main():
     df = load_historical_data(csv_path)
     logger.info(f"Loaded {len(df)} records")
 
-    historical_types = get_historical_facility_types(df)
+    historical_types = get_historical_facility_types(df, now=today)
     logger.info(f"Found {len(historical_types)} historical facility types: {historical_types}")
 
+    # Slice the recent window once; the 24h/48h checks only need this part
+    recent = rows_since(df, berlin_cutoff(timedelta(hours=RECENT_WINDOW_HOURS), today))
+    recent_types = get_recent_facility_types(recent, now=today)
+
     # Run checks
     all_issues = []
 
-    issues = check_new_facility_types(df, historical_types)
+    issues = check_new_facility_types(recent, historical_types, recent_types)
     all_issues.extend(issues)
     if issues:
         logger.warning(f"Found {len(issues)} new facility type issues")
 
-    issues = check_missing_facility_types(df, historical_types)
+    issues = check_missing_facility_types(recent, historical_types, recent_types)
     all_issues.extend(issues)
     if issues:
         logger.warning(f"Found {len(issues)} missing facility type issues")
 
-    issues = check_invalid_occupancy(df)
+    issues = check_invalid_occupancy(recent, now=today)
     all_issues.extend(issues)
     if issues:
         logger.warning(f"Found {len(issues)} invalid occupancy issues")
 
-    issues = check_extended_zero_occupancy(df)
+    issues = check_extended_zero_occupancy(recent, now=today)
     all_issues.extend(issues)
     if issues:
         logger.warning(f"Found {len(issues)} extended zero occupancy issues")
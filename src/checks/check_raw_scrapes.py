@@ -5,20 +5,39 @@ import argparse
 import json
 import logging
 import re
-import subprocess
 import sys
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import AbstractSet, Iterator
 from zoneinfo import ZoneInfo
 
+import numpy as np
+
+# Allow `from checks._gh import ...` when running this file as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from checks._gh import create_github_issue  # noqa: E402
+
 TIMEZONE = ZoneInfo("Europe/Berlin")
 GAP_THRESHOLD_HOURS = 2
 HISTORICAL_DAYS = 30
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+CAPACITY_PATTERN = re.compile(r"/(\d+)\s*persons?")
+SCRAPE_FILE_PATTERN = re.compile(r"pool_data_(\d{8})_.*\.json$")
+# Scrape file names carry the Berlin local scrape time to the second
+SCRAPE_TIME_PATTERN = re.compile(r"pool_data_(\d{8}_\d{6})\.json$")
+
+# Top-level scrape keys with a known meaning; anything else is inspected
+FACILITY_KEYS = frozenset({"pools", "saunas", "ice_rinks"})
+NON_FACILITY_KEYS = frozenset({
+    "scrape_timestamp", "scrape_metadata", "summary", "_filepath", "_parsed_timestamp",
+})
+
+# One facility entry of a scrape; a tuple is a fraction of the size of a dict
+Facility = namedtuple("Facility", ["name", "type", "capacity", "timestamp"])
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,55 +52,89 @@ def parse_capacity(raw_occupancy: str) -> int | None:
     """
     if not raw_occupancy:
         return None
-    match = re.search(r"/(\d+)\s*persons?", raw_occupancy)
-    if match:
-        return int(match.group(1))
-    return None
+    # Fast path for the usual "57/311 persons" shape; the regex covers the rest
+    _, sep, tail = raw_occupancy.partition("/")
+    if sep:
+        number, _, unit = tail.partition(" ")
+        if number.isascii() and number.isdigit() and unit.startswith("person"):
+            return int(number)
+    match = CAPACITY_PATTERN.search(raw_occupancy)
+    return int(match.group(1)) if match else None
+
+
+def _iter_facility_records(data: dict) -> Iterator[dict]:
+    """Yield the raw facility entries of a scrape JSON.
+
+    Known facility lists are taken as-is (a null or non-list value is skipped)
+    and known metadata keys are skipped.
+    Any other key goes through dynamic discovery (a non-empty list whose first
+    item is a dict with a facility_type), so new facility lists are still
+    picked up by the new-facility check.
+    """
+    for key, value in data.items():
+        if key in FACILITY_KEYS:
+            if isinstance(value, list):
+                yield from value
+        elif key in NON_FACILITY_KEYS:
+            continue
+        elif isinstance(value, list) and value and isinstance(value[0], dict) and "facility_type" in value[0]:
+            yield from value
 
 
-def extract_facilities_from_scrape(data: dict) -> list[dict]:
+def extract_facilities_from_scrape(data: dict) -> list[Facility]:
     """Extract all facilities from a scrape JSON.
 
     Args:
         data: Parsed JSON scrape data
 
     Returns:
-        List of facility dicts with name, type, capacity
+        List of Facility tuples with name, type, capacity, timestamp
     """
-    facilities = []
-    for key, value in data.items():
-        if not isinstance(value, list) or not value:
-            continue
-        if isinstance(value[0], dict) and "facility_type" in value[0]:
-            for fac in value:
-                capacity = parse_capacity(fac.get("raw_occupancy"))
-                facilities.append({
-                    "name": fac.get("pool_name"),
-                    "type": fac.get("facility_type"),
-                    "capacity": capacity,
-                    "timestamp": fac.get("timestamp"),
-                })
-    return facilities
+    return [
+        Facility(
+            fac.get("pool_name"),
+            fac.get("facility_type"),
+            parse_capacity(fac.get("raw_occupancy")),
+            fac.get("timestamp"),
+        )
+        for fac in _iter_facility_records(data)
+    ]
 
 
-def load_scrapes_for_date(scrape_dir: Path, target_date: datetime) -> list[dict]:
-    """Load all scrapes for a specific date.
+def index_scrape_files(scrape_dir: Path) -> dict[str, list[Path]]:
+    """Bucket scrape files by the date in their filename with one directory listing.
 
     Args:
         scrape_dir: Directory containing pool_data_*.json files
-        target_date: Date to load scrapes for
+
+    Returns:
+        Dict mapping YYYYMMDD to the sorted list of that day's files
+    """
+    files_by_date = defaultdict(list)
+    for filepath in scrape_dir.iterdir():
+        match = SCRAPE_FILE_PATTERN.match(filepath.name)
+        if match:
+            files_by_date[match.group(1)].append(filepath)
+    for paths in files_by_date.values():
+        paths.sort()
+    return dict(files_by_date)
+
+
+def load_scrape_files(filepaths: list[Path]) -> list[dict]:
+    """Load and parse a list of scrape files.
+
+    Args:
+        filepaths: pool_data_*.json files to load, in order
 
     Returns:
         List of parsed scrape dicts with timestamps
     """
-    date_str = target_date.strftime("%Y%m%d")
-    pattern = f"pool_data_{date_str}_*.json"
     scrapes = []
 
-    for filepath in sorted(scrape_dir.glob(pattern)):
+    for filepath in filepaths:
         try:
-            with open(filepath, encoding="utf-8") as f:
-                data = json.load(f)
+            # Decode straight from bytes; skips the text-mode decoding layer
+            data = json.loads(filepath.read_bytes())
             scrape_ts = data.get("scrape_timestamp")
             if scrape_ts:
                 data["_filepath"] = filepath
@@ -93,112 +146,228 @@ def load_scrapes_for_date(scrape_dir: Path, target_date: datetime) -> list[dict]
     return scrapes
 
 
-def get_historical_facilities(scrape_dir: Path, days: int = HISTORICAL_DAYS) -> set[tuple[str, str]]:
-    """Get set of (type, name) tuples seen in historical scrapes.
+def load_scrapes_for_date(scrape_dir: Path, target_date: datetime) -> list[dict]:
+    """Load all scrapes for a specific date.
 
     Args:
         scrape_dir: Directory containing pool_data_*.json files
-        days: Number of days to look back
+        target_date: Date to load scrapes for
 
     Returns:
-        Set of (facility_type, facility_name) tuples
+        List of parsed scrape dicts with timestamps
+    """
+    date_str = target_date.strftime("%Y%m%d")
+    pattern = f"pool_data_{date_str}_*.json"
+    return load_scrape_files(sorted(scrape_dir.glob(pattern)))
+
+
+def summarize_scrapes(
+    scrapes: list[dict]
+) -> tuple[frozenset[tuple[str, str]], dict[tuple[str, str], int]]:
+    """Collect facilities and capacities from scrapes in one walk.
+
+    Args:
+        scrapes: List of parsed scrape dicts
+
+    Returns:
+        Tuple of (set of (facility_type, facility_name) tuples,
+        dict mapping (facility_type, facility_name) to first-seen capacity)
     """
     facilities = set()
-    today = datetime.now(TIMEZONE).date()
+    capacities = {}
+    for scrape in scrapes:
+        for fac in _iter_facility_records(scrape):
+            key = (fac.get("facility_type"), fac.get("pool_name"))
+            facilities.add(key)
+            # Only the first capacity per facility is kept, so parse lazily
+            if key not in capacities:
+                capacity = parse_capacity(fac.get("raw_occupancy"))
+                if capacity:
+                    capacities[key] = capacity
+    return frozenset(facilities), capacities
 
-    for day_offset in range(1, days + 1):
-        target_date = today - timedelta(days=day_offset)
-        scrapes = load_scrapes_for_date(scrape_dir, datetime.combine(target_date, datetime.min.time()))
-        for scrape in scrapes:
-            for fac in extract_facilities_from_scrape(scrape):
-                facilities.add((fac["type"], fac["name"]))
 
-    return facilities
+def _scan_day(filepaths: list[Path]) -> tuple[frozenset[tuple[str, str]], dict[tuple[str, str], int]]:
+    """Collect facilities and first-seen capacities from one day of scrape files."""
+    return summarize_scrapes(load_scrape_files(filepaths))
 
 
-def get_historical_capacities(scrape_dir: Path, days: int = HISTORICAL_DAYS) -> dict[tuple[str, str], int]:
-    """Get most recent capacity for each facility from historical scrapes.
+def _day_signature(filepaths: list[Path]) -> tuple[tuple[str, int], ...]:
+    """Fingerprint one day's scrape files as sorted (file name, size) pairs.
+
+    Scrape files are written once under a timestamped name, so name and size
+    identify their content. Unlike mtimes, they survive a fresh git checkout.
+    """
+    return tuple(sorted((p.name, p.stat().st_size) for p in filepaths))
+
+
+def load_history_cache(cache_path: Path) -> dict:
+    """Load the per-day history cache, or an empty one if missing/unreadable.
+
+    Args:
+        cache_path: Path to the JSON cache file
+
+    Returns:
+        Dict mapping YYYYMMDD to (signature, facilities, capacities)
+    """
+    if not cache_path.exists():
+        return {}
+    try:
+        raw = json.loads(cache_path.read_bytes())
+        return {
+            date_key: (
+                tuple((name, size) for name, size in entry["files"]),
+                frozenset((fac_type, fac_name) for fac_type, fac_name in entry["facilities"]),
+                {(fac_type, fac_name): capacity for fac_type, fac_name, capacity in entry["capacities"]},
+            )
+            for date_key, entry in raw.items()
+        }
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+        logger.warning(f"Ignoring unreadable history cache {cache_path}: {e}")
+        return {}
+
+
+def save_history_cache(cache: dict, cache_path: Path) -> None:
+    """Save the per-day history cache.
+
+    Args:
+        cache: Dict mapping YYYYMMDD to (signature, facilities, capacities)
+        cache_path: Path to the JSON cache file
+    """
+    raw = {
+        date_key: {
+            "files": [list(item) for item in signature],
+            "facilities": [list(key) for key in facilities],
+            "capacities": [[*key, capacity] for key, capacity in capacities.items()],
+        }
+        for date_key, (signature, facilities, capacities) in sorted(cache.items())
+    }
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps(raw), encoding="utf-8")
+
+
+def scan_history(
+    scrape_dir: Path,
+    days: int = HISTORICAL_DAYS,
+    max_workers: int | None = None,
+    cache_path: Path | None = None
+) -> tuple[frozenset[tuple[str, str]], dict[tuple[str, str], int]]:
+    """Collect historical facilities and capacities in a single pass.
+
+    Each scrape file in the window is loaded and parsed once. Days are
+    independent, so they are parsed in parallel worker processes. With a
+    cache file, days whose files are unchanged since the last run (same
+    file names and sizes) are taken from the cache instead.
 
     Args:
         scrape_dir: Directory containing pool_data_*.json files
         days: Number of days to look back
+        max_workers: Worker process count (default: number of CPUs)
+        cache_path: Optional per-day results cache (disabled if None)
 
     Returns:
-        Dict mapping (facility_type, facility_name) to capacity
+        Tuple of (set of (facility_type, facility_name) tuples,
+        dict mapping (facility_type, facility_name) to most recent capacity)
     """
-    capacities = {}
     today = datetime.now(TIMEZONE).date()
+    date_keys = [
+        (today - timedelta(days=day_offset)).strftime("%Y%m%d")
+        for day_offset in range(1, days + 1)
+    ]
+    files_by_date = index_scrape_files(scrape_dir)
+
+    cache = load_history_cache(cache_path) if cache_path else {}
+    results = {}
+    pending = []
+    for date_key in date_keys:
+        filepaths = files_by_date.get(date_key)
+        if not filepaths:
+            results[date_key] = (frozenset(), {})
+            continue
+        signature = _day_signature(filepaths)
+        cached = cache.get(date_key)
+        if cached and cached[0] == signature:
+            results[date_key] = (cached[1], cached[2])
+        else:
+            pending.append((date_key, signature))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            scanned = executor.map(_scan_day, [files_by_date[date_key] for date_key, _ in pending])
+            for (date_key, signature), (day_facilities, day_capacities) in zip(pending, scanned):
+                results[date_key] = (day_facilities, day_capacities)
+                cache[date_key] = (signature, day_facilities, day_capacities)
+        logger.info(f"Scanned {len(pending)} of {len(date_keys)} history days")
+
+    if cache_path:
+        save_history_cache({k: v for k, v in cache.items() if k in results}, cache_path)
+
+    facilities = frozenset().union(*(results[date_key][0] for date_key in date_keys))
+    # Reduce newest day first, so the first capacity seen for a facility is the most recent one
+    capacities = {}
+    for date_key in date_keys:
+        for key, capacity in results[date_key][1].items():
+            capacities.setdefault(key, capacity)
 
-    for day_offset in range(1, days + 1):
-        target_date = today - timedelta(days=day_offset)
-        scrapes = load_scrapes_for_date(scrape_dir, datetime.combine(target_date, datetime.min.time()))
-        for scrape in scrapes:
-            for fac in extract_facilities_from_scrape(scrape):
-                key = (fac["type"], fac["name"])
-                if fac["capacity"] and key not in capacities:
-                    capacities[key] = fac["capacity"]
-
-    return capacities
+    return facilities, capacities
 
 
 def check_missing_facilities(
     today_scrapes: list[dict],
-    historical_facilities: set[tuple[str, str]]
+    historical_facilities: AbstractSet[tuple[str, str]],
+    today_facilities: AbstractSet[tuple[str, str]] | None = None
 ) -> list[str]:
     """Check for facilities missing for 2+ hours.
 
     Args:
         today_scrapes: List of today's scrape dicts
         historical_facilities: Set of (type, name) from history
+        today_facilities: Precomputed (type, name) set from summarize_scrapes()
 
     Returns:
         List of issue descriptions
     """
-    if not today_scrapes:
+    # Cheap scalar checks first: a facility only counts as missing once today's
+    # scrapes cover 2+ hours (8 scrapes = 2 hours at 15-min intervals)
+    if len(today_scrapes) < 8:
         return []
 
-    issues = []
-    today_facilities = set()
+    first_scrape = min(s["_parsed_timestamp"] for s in today_scrapes)
+    last_scrape = max(s["_parsed_timestamp"] for s in today_scrapes)
+    duration = last_scrape - first_scrape
+    if duration < timedelta(hours=GAP_THRESHOLD_HOURS):
+        return []
 
-    for scrape in today_scrapes:
-        for fac in extract_facilities_from_scrape(scrape):
-            today_facilities.add((fac["type"], fac["name"]))
+    if today_facilities is None:
+        today_facilities, _ = summarize_scrapes(today_scrapes)
 
     # Find facilities in history but not in today's scrapes
     missing = historical_facilities - today_facilities
 
-    # Check if missing for 2+ hours by looking at scrape timestamps
-    if missing and len(today_scrapes) >= 8:  # 8 scrapes = 2 hours at 15-min intervals
-        first_scrape = min(s["_parsed_timestamp"] for s in today_scrapes)
-        last_scrape = max(s["_parsed_timestamp"] for s in today_scrapes)
-        duration = last_scrape - first_scrape
-
-        if duration >= timedelta(hours=GAP_THRESHOLD_HOURS):
-            for fac_type, fac_name in sorted(missing):
-                issues.append(f"Missing facility: {fac_type}:{fac_name} (not seen in {len(today_scrapes)} scrapes over {duration})")
-
-    return issues
+    return [
+        f"Missing facility: {fac_type}:{fac_name} (not seen in {len(today_scrapes)} scrapes over {duration})"
+        for fac_type, fac_name in sorted(missing)
+    ]
 
 
 def check_new_facilities(
     today_scrapes: list[dict],
-    historical_facilities: set[tuple[str, str]]
+    historical_facilities: AbstractSet[tuple[str, str]],
+    today_facilities: AbstractSet[tuple[str, str]] | None = None
 ) -> list[str]:
     """Check for new facilities not in historical data.
 
     Args:
         today_scrapes: List of today's scrape dicts
         historical_facilities: Set of (type, name) from history
+        today_facilities: Precomputed (type, name) set from summarize_scrapes()
 
     Returns:
         List of issue descriptions
     """
     issues = []
-    today_facilities = set()
-
-    for scrape in today_scrapes:
-        for fac in extract_facilities_from_scrape(scrape):
-            today_facilities.add((fac["type"], fac["name"]))
+    if today_facilities is None:
+        today_facilities, _ = summarize_scrapes(today_scrapes)
 
     new_facilities = today_facilities - historical_facilities
 
@@ -210,99 +379,104 @@ def check_new_facilities(
 
 def check_capacity_changes(
     today_scrapes: list[dict],
-    historical_capacities: dict[tuple[str, str], int]
+    historical_capacities: dict[tuple[str, str], int],
+    today_capacities: dict[tuple[str, str], int] | None = None
 ) -> list[str]:
     """Check for capacity changes compared to historical data.
 
     Args:
         today_scrapes: List of today's scrape dicts
         historical_capacities: Dict of (type, name) to capacity
+        today_capacities: Precomputed (type, name) to capacity from summarize_scrapes()
 
     Returns:
         List of issue descriptions
     """
     issues = []
-    today_capacities = {}
-
-    for scrape in today_scrapes:
-        for fac in extract_facilities_from_scrape(scrape):
-            key = (fac["type"], fac["name"])
-            if fac["capacity"] and key not in today_capacities:
-                today_capacities[key] = fac["capacity"]
+    if today_capacities is None:
+        _, today_capacities = summarize_scrapes(today_scrapes)
 
+    # Both sides are already hash maps keyed by (type, name): one probe per facility
     for key, today_cap in today_capacities.items():
-        if key in historical_capacities:
-            hist_cap = historical_capacities[key]
-            if today_cap != hist_cap:
-                fac_type, fac_name = key
-                issues.append(f"Capacity change: {fac_type}:{fac_name} ({hist_cap} -> {today_cap})")
+        hist_cap = historical_capacities.get(key)
+        if hist_cap is not None and today_cap != hist_cap:
+            fac_type, fac_name = key
+            issues.append(f"Capacity change: {fac_type}:{fac_name} ({hist_cap} -> {today_cap})")
 
     return issues
 
 
-def check_scrape_gaps(scrape_dir: Path, target_date: datetime) -> list[str]:
+def scrape_times_from_filenames(filepaths: list[Path]) -> list[datetime] | None:
+    """Read scrape times from pool_data_YYYYMMDD_HHMMSS.json names.
+
+    Args:
+        filepaths: Scrape files to date
+
+    Returns:
+        Berlin-local aware datetimes in input order, or None if any name
+        does not follow the pattern
+    """
+    times = []
+    for filepath in filepaths:
+        match = SCRAPE_TIME_PATTERN.search(filepath.name)
+        if not match:
+            return None
+        times.append(datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").replace(tzinfo=TIMEZONE))
+    return times
+
+
+def check_scrape_gaps(
+    scrape_dir: Path,
+    target_date: datetime,
+    scrapes: list[dict] | None = None
+) -> list[str]:
     """Check for gaps of 2+ hours between scrapes.
 
     Args:
         scrape_dir: Directory containing pool_data_*.json files
         target_date: Date to check
+        scrapes: Already-loaded scrapes for target_date (default: take the
+            times from the file names, opening the files only if a name
+            does not carry one)
 
     Returns:
         List of issue descriptions
     """
-    scrapes = load_scrapes_for_date(scrape_dir, target_date)
+    if scrapes is not None:
+        timestamps = [s["_parsed_timestamp"] for s in scrapes]
+    else:
+        filepaths = sorted(scrape_dir.glob(f"pool_data_{target_date.strftime('%Y%m%d')}_*.json"))
+        timestamps = scrape_times_from_filenames(filepaths)
+        if timestamps is None:
+            timestamps = [s["_parsed_timestamp"] for s in load_scrape_files(filepaths)]
 
-    if len(scrapes) < 2:
-        return [f"Insufficient scrapes: only {len(scrapes)} scrapes found for {target_date.date()}"]
+    if len(timestamps) < 2:
+        return [f"Insufficient scrapes: only {len(timestamps)} scrapes found for {target_date.date()}"]
 
     issues = []
-    timestamps = sorted(s["_parsed_timestamp"] for s in scrapes)
-
-    for i in range(1, len(timestamps)):
-        gap = timestamps[i] - timestamps[i - 1]
-        if gap >= timedelta(hours=GAP_THRESHOLD_HOURS):
-            issues.append(
-                f"Scrape gap: {gap} between "
-                f"{timestamps[i-1].strftime('%H:%M')} and {timestamps[i].strftime('%H:%M')}"
-            )
+    # Diff epoch seconds in one vectorized pass; only flagged gaps are formatted
+    seconds = np.array([ts.timestamp() for ts in timestamps])
+    order = np.argsort(seconds, kind="stable")
+    gap_idx = np.flatnonzero(np.diff(seconds[order]) >= GAP_THRESHOLD_HOURS * 3600)
+
+    for i in gap_idx:
+        prev_ts, next_ts = timestamps[order[i]], timestamps[order[i + 1]]
+        gap = next_ts - prev_ts
+        issues.append(
+            f"Scrape gap: {gap} between "
+            f"{prev_ts.strftime('%H:%M')} and {next_ts.strftime('%H:%M')}"
+        )
 
     return issues
 
 
-def create_github_issue(title: str, body: str, dry_run: bool = False) -> bool:
-    """Create a GitHub issue using gh CLI.
-
-    Args:
-        title: Issue title
-        body: Issue body
-        dry_run: If True, only log what would be created
-
-    Returns:
-        True if issue created successfully
-    """
-    if dry_run:
-        logger.info(f"[DRY RUN] Would create issue: {title}")
-        logger.info(f"[DRY RUN] Body:\n{body}")
-        return True
-
-    try:
-        result = subprocess.run(
-            ["gh", "issue", "create", "--title", title, "--body", body, "--label", "data-irregularity"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        logger.info(f"Created issue: {result.stdout.strip()}")
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Failed to create issue: {e.stderr}")
-        return False
-    except FileNotFoundError:
-        logger.error("gh CLI not found. Install GitHub CLI to create issues.")
-        return False
-
-
 def main():
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     parser = argparse.ArgumentParser(description="Check raw scrape data for irregularities")
     parser.add_argument(
         "--scrape-dir",
@@ -315,6 +489,12 @@ def main():
         action="store_true",
         help="Don't create GitHub issues, just log what would be created"
     )
+    parser.add_argument(
+        "--history-cache",
+        type=str,
+        default=None,
+        help="Optional JSON file caching per-day history results between runs"
+    )
     args = parser.parse_args()
 
     scrape_dir = Path(args.scrape_dir)
@@ -327,33 +507,35 @@ def main():
 
     # Load data
     logger.info("Loading historical data...")
-    historical_facilities = get_historical_facilities(scrape_dir)
-    historical_capacities = get_historical_capacities(scrape_dir)
+    cache_path = Path(args.history_cache) if args.history_cache else None
+    historical_facilities, historical_capacities = scan_history(scrape_dir, cache_path=cache_path)
     logger.info(f"Found {len(historical_facilities)} historical facilities")
 
     logger.info("Loading today's scrapes...")
     today_scrapes = load_scrapes_for_date(scrape_dir, today)
     logger.info(f"Found {len(today_scrapes)} scrapes for today")
+    today_facilities, today_capacities = summarize_scrapes(today_scrapes)
 
     # Run checks
     all_issues = []
 
-    issues = check_missing_facilities(today_scrapes, historical_facilities)
+    issues = check_missing_facilities(today_scrapes, historical_facilities, today_facilities)
     all_issues.extend(issues)
     if issues:
         logger.warning(f"Found {len(issues)} missing facility issues")
 
-    issues = check_new_facilities(today_scrapes, historical_facilities)
+    issues = check_new_facilities(today_scrapes, historical_facilities, today_facilities)
     all_issues.extend(issues)
     if issues:
         logger.warning(f"Found {len(issues)} new facility issues")
 
-    issues = check_capacity_changes(today_scrapes, historical_capacities)
+    issues = check_capacity_changes(today_scrapes, historical_capacities, today_capacities)
     all_issues.extend(issues)
     if issues:
         logger.warning(f"Found {len(issues)} capacity change issues")
 
-    issues = check_scrape_gaps(scrape_dir, today)
+    # Reuse today's scrapes and their parsed timestamps instead of re-reading the files
+    issues = check_scrape_gaps(scrape_dir, today, today_scrapes)
     all_issues.extend(issues)
     if issues:
         logger.warning(f"Found {len(issues)} scrape gap issues")
@@ -2,14 +2,17 @@
 """Generate occupancy forecasts for all facilities."""
 
 import argparse
+import gzip
 import json
 import logging
 import pickle
 import sys
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 
 # Allow `from loaders.opening_hours_loader import ...` when running from
@@ -21,14 +24,27 @@ from loaders.opening_hours_loader import (  # noqa: E402
     is_facility_open,
     load_latest_snapshot,
 )
+from loaders.timestamps import format_iso_timestamps  # noqa: E402
 
 TIMEZONE = ZoneInfo("Europe/Berlin")
 FORECAST_HOURS = 48
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Compact dtypes for the predict matrix. Weather values come at 0.1
+# resolution and split thresholds sit halfway between them, so float32
+# rounding cannot move a value across a split. weather_code stays float32
+# (as in training) because short Open-Meteo series leave missing codes as NaN.
+FEATURE_DTYPES = {
+    "hour": "int8",
+    "day_of_week": "int8",
+    "month": "int8",
+    "is_weekend": "int8",
+    "is_holiday": "int8",
+    "is_school_vacation": "int8",
+    "temperature_c": "float32",
+    "precipitation_mm": "float32",
+    "weather_code": "float32",
+}
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,18 +59,31 @@ def _load_facility_aliases() -> dict:
     if not path.exists():
         logger.warning(f"Facility aliases file not found: {path}")
         return {}
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
+    return json.loads(path.read_bytes())
 
 
 def load_model(model_path: Path):
-    """Load trained model from pickle file."""
+    """Load trained model.
+
+    ``.txt`` and ``.txt.gz`` paths are read as LightGBM native model files,
+    which skips unpickling and keeps the facility categories the model was
+    trained with; anything else is treated as a legacy pickled Booster.
+    """
     if not model_path.exists():
         logger.error(f"Model file not found: {model_path}")
         sys.exit(1)
 
-    with open(model_path, "rb") as f:
-        model = pickle.load(f)
+    if model_path.suffixes[-2:] == [".txt", ".gz"]:
+        import lightgbm as lgb
+
+        model = lgb.Booster(model_str=gzip.decompress(model_path.read_bytes()).decode())
+    elif model_path.suffix == ".txt":
+        import lightgbm as lgb
+
+        model = lgb.Booster(model_file=str(model_path))
+    else:
+        with open(model_path, "rb") as f:
+            model = pickle.load(f)
     logger.info(f"Loaded model from {model_path}")
     return model
 
@@ -70,13 +99,11 @@ def get_latest_weather_file(weather_dir: Path) -> Path:
 
 def load_weather_forecast(weather_path: Path, start_time: datetime) -> pd.DataFrame:
     """Load weather forecast data for the next 48 hours."""
-    with open(weather_path, "r") as f:
-        data = json.load(f)
+    data = json.loads(weather_path.read_bytes())
 
-    hourly = data["hourly"]
-    df = pd.DataFrame(hourly)
+    df = pd.DataFrame(data["hourly"])
     # Parse via UTC to handle mixed offsets (CET/CEST) around DST switch
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, format="ISO8601")
     df["timestamp"] = df["timestamp"].dt.tz_convert("Europe/Berlin")
 
     # Filter to next 48 hours from start_time
@@ -96,6 +123,27 @@ def load_weather_forecast(weather_path: Path, start_time: datetime) -> pd.DataFr
     return df
 
 
+@lru_cache(maxsize=4)
+def _read_facilities(config_path: Path, mtime_ns: int) -> tuple[tuple[str, str], ...]:
+    """Parse facility_types.json into (facility_name, facility_type) pairs.
+
+    Memoized per path and modification time, so an edited file is re-read.
+    """
+    raw_data = json.loads(config_path.read_bytes())
+
+    # Parse composite keys "type:name" -> (name, type)
+    facilities = []
+    for key, facility_type in raw_data.items():
+        if ":" in key:
+            # New composite key format: "type:name"
+            _, facility_name = key.split(":", 1)
+        else:
+            # Legacy format: just the name
+            facility_name = key
+        facilities.append((facility_name, facility_type))
+    return tuple(facilities)
+
+
 def get_facilities(config_path: Path = None) -> list[tuple[str, str]]:
     """Get list of facilities and their types from config file.
 
@@ -113,66 +161,56 @@ def get_facilities(config_path: Path = None) -> list[tuple[str, str]]:
         logger.error("Run transform.py first to generate this file")
         sys.exit(1)
 
-    with open(config_path, "r") as f:
-        raw_data = json.load(f)
-
-    # Parse composite keys "type:name" -> (name, type)
-    facilities = []
-    for key, facility_type in raw_data.items():
-        if ":" in key:
-            # New composite key format: "type:name"
-            _, facility_name = key.split(":", 1)
-        else:
-            # Legacy format: just the name
-            facility_name = key
-        facilities.append((facility_name, facility_type))
-
+    config_path = config_path.resolve()
+    facilities = list(_read_facilities(config_path, config_path.stat().st_mtime_ns))
     logger.info(f"Found {len(facilities)} facilities")
     return facilities
 
 
-def load_holiday_data(holiday_dir: Path) -> tuple[set, list]:
-    """Load public holidays and school vacation periods."""
-    public_holidays = set()
-    school_vacations = []
+def load_holiday_data(holiday_dir: Path) -> tuple[frozenset, frozenset]:
+    """Load public holidays and school vacation days as dates.
+
+    Vacation periods are expanded to their individual days once here, so
+    per-hour lookups are set membership instead of a scan over periods.
+    """
+    public_holidays = frozenset()
+    school_vacation_days = frozenset()
 
     # Load public holidays
     public_path = holiday_dir / "public_holidays.json"
     if public_path.exists():
-        with open(public_path, "r") as f:
-            data = json.load(f)
-            # Extract date strings from holiday objects
-            public_holidays = {h["date"] for h in data.get("holidays", [])}
+        data = json.loads(public_path.read_bytes())
+        # Extract dates from holiday objects
+        public_holidays = frozenset(date.fromisoformat(h["date"]) for h in data.get("holidays", []))
 
     # Load school vacations
     school_path = holiday_dir / "school_holidays.json"
     if school_path.exists():
-        with open(school_path, "r") as f:
-            data = json.load(f)
-            school_vacations = data.get("vacations", [])
-
-    return public_holidays, school_vacations
-
+        data = json.loads(school_path.read_bytes())
+        school_vacation_days = frozenset(
+            day.date()
+            for period in data.get("vacations", [])
+            for day in pd.date_range(period["start"], period["end"], freq="D")
+        )
 
-def is_school_vacation(dt: datetime, vacations: list) -> bool:
-    """Check if date falls within a school vacation period."""
-    date_str = dt.strftime("%Y-%m-%d")
-    for period in vacations:
-        if period["start"] <= date_str <= period["end"]:
-            return True
-    return False
+    return public_holidays, school_vacation_days
 
 
 def generate_forecasts(
     model,
     facility_types: list[tuple[str, str]],
     weather_df: pd.DataFrame,
-    public_holidays: set,
-    school_vacations: list,
+    public_holidays: frozenset,
+    school_vacations: frozenset,
     opening_schedules: dict | None = None,
-) -> list[dict]:
+) -> pd.DataFrame:
     """Generate occupancy predictions for all facilities and hours.
 
+    Rows come out ordered by timestamp, then facility name, which is the
+    order ``save_forecasts`` writes. Features are built column-wise for the
+    whole hours x facilities grid; keep row iteration (``iterrows``) out of
+    this path, the tests enforce it.
+
     If *opening_schedules* is provided (from ``load_latest_snapshot``), the
     model prediction is overridden for hours when the facility is scheduled
     closed: ``is_open = 0`` and ``occupancy_percent = 0.0``. Facilities
@@ -182,93 +220,106 @@ def generate_forecasts(
     opening_schedules = opening_schedules or {}
     unknown_facility_warned: set[tuple[str, str]] = set()
 
-    forecasts = []
-
-    for _, weather_row in weather_df.iterrows():
-        ts = weather_row["timestamp"]
-        # Timestamps are already tz-aware (Europe/Berlin) from load_weather_forecast
-        ts_tz = ts if ts.tzinfo is not None else ts.tz_localize(TIMEZONE)
-
-        # Compute time-based features from Berlin local time
-        hour = ts_tz.hour
-        day_of_week = ts_tz.dayofweek
-        month = ts_tz.month
-        is_weekend = 1 if ts_tz.dayofweek >= 5 else 0
-        is_holiday = 1 if ts_tz.strftime("%Y-%m-%d") in public_holidays else 0
-        is_school_vac = 1 if is_school_vacation(ts_tz, school_vacations) else 0
-
-        # Build features for each facility
-        for facility_name, facility_type in facility_types:
-            features = pd.DataFrame([{
-                "facility": facility_name,
-                "hour": hour,
-                "day_of_week": day_of_week,
-                "month": month,
-                "is_weekend": is_weekend,
-                "is_holiday": is_holiday,
-                "is_school_vacation": is_school_vac,
-                "temperature_c": weather_row["temperature_c"],
-                "precipitation_mm": weather_row["precipitation_mm"],
-                "weather_code": weather_row["weather_code"],
-            }])
-            features["facility"] = features["facility"].astype("category")
-
-            prediction = model.predict(features)[0]
-            # Clamp to valid range
-            prediction = max(0, min(100, prediction))
-
-            # Apply deterministic opening-hours overlay
-            is_open_now = is_facility_open(
-                opening_schedules, facility_type, facility_name,
-                ts_tz.to_pydatetime() if hasattr(ts_tz, "to_pydatetime") else ts_tz,
-            )
-            if is_open_now is False:
-                prediction = 0.0
-                is_open_value: int | str = 0
-            elif is_open_now is True:
-                is_open_value = 1
-            else:  # None — facility missing from snapshot
-                is_open_value = "NULL"
-                key = (facility_type, facility_name)
-                if opening_schedules and key not in unknown_facility_warned:
-                    logger.warning(
-                        f"No opening hours known for {facility_type}:{facility_name}"
-                    )
-                    unknown_facility_warned.add(key)
-
-            # Format timestamp as ISO 8601 with timezone
-            ts_str = ts_tz.strftime("%Y-%m-%dT%H:%M:%S%z")
-            # Insert colon in timezone offset for ISO 8601 compliance (+0100 -> +01:00)
-            ts_str = ts_str[:-2] + ":" + ts_str[-2:]
-
-            forecasts.append({
-                "timestamp": ts_str,
-                "facility_name": facility_name,
-                "facility_type": facility_type,
-                "occupancy_percent": round(prediction, 1),
-                "is_open": is_open_value,
-                "hour": hour,
-                "day_of_week": day_of_week,
-                "month": month,
-                "is_weekend": is_weekend,
-                "is_holiday": is_holiday,
-                "is_school_vacation": is_school_vac,
-                "temperature_c": weather_row["temperature_c"],
-                "precipitation_mm": weather_row["precipitation_mm"],
-                "weather_code": weather_row["weather_code"],
-                "cloud_cover_percent": weather_row.get("cloud_cover_percent"),
-                "data_source": "forecast",
-            })
-
-    return forecasts
-
-
-def save_forecasts(forecasts: list[dict], output_path: Path) -> None:
-    """Save forecasts to CSV file."""
+    facility_types = sorted(facility_types)
+    n_facilities = len(facility_types)
+    facility_names = [name for name, _ in facility_types]
+    # Encode facilities once; the same name can appear under several types
+    facility_dtype = pd.CategoricalDtype(pd.unique(pd.Series(facility_names, dtype=object)))
+    facility_codes = facility_dtype.categories.get_indexer(facility_names).astype(np.int16)
+
+    # Timestamps are already tz-aware (Europe/Berlin) from load_weather_forecast
+    weather_df = weather_df.sort_values("timestamp", kind="mergesort", ignore_index=True)
+    ts = weather_df["timestamp"]
+    if ts.dt.tz is None:
+        ts = ts.dt.tz_localize(TIMEZONE, nonexistent="shift_forward")
+
+    # Compute time-based features from Berlin local time, one vectorized pass per column
+    day_of_week = ts.dt.dayofweek.to_numpy()
+    ts_strs = format_iso_timestamps(ts)
+    local_days = ts.dt.tz_localize(None).to_numpy().astype("datetime64[D]")
+    hourly_df = pd.DataFrame({
+        "ts": ts,
+        "timestamp": ts_strs,
+        "hour": ts.dt.hour.to_numpy(),
+        "day_of_week": day_of_week,
+        "month": ts.dt.month.to_numpy(),
+        "is_weekend": (day_of_week >= 5).astype(int),
+        "is_holiday": np.isin(local_days, np.array(list(public_holidays), dtype="datetime64[D]")).astype(int),
+        "is_school_vacation": np.isin(local_days, np.array(list(school_vacations), dtype="datetime64[D]")).astype(int),
+    })
+
+    # Cross join hours x facilities (hour-major) so the model is called once
+    weather_cols = ["temperature_c", "precipitation_mm", "weather_code"]
+    grid = pd.concat(
+        [hourly_df, weather_df[weather_cols]], axis=1
+    ).loc[np.repeat(np.arange(len(weather_df)), n_facilities)].reset_index(drop=True)
+    if "cloud_cover_percent" in weather_df.columns:
+        cloud_cover = np.repeat(weather_df["cloud_cover_percent"].to_numpy(dtype=object), n_facilities)
+    else:
+        cloud_cover = None
+    grid_names = np.tile(np.asarray(facility_names, dtype=object), len(weather_df))
+    grid_types = np.tile(np.asarray([t for _, t in facility_types], dtype=object), len(weather_df))
+
+    features = pd.DataFrame({
+        "facility": pd.Categorical.from_codes(np.tile(facility_codes, len(weather_df)), dtype=facility_dtype),
+        "hour": grid["hour"],
+        "day_of_week": grid["day_of_week"],
+        "month": grid["month"],
+        "is_weekend": grid["is_weekend"],
+        "is_holiday": grid["is_holiday"],
+        "is_school_vacation": grid["is_school_vacation"],
+        "temperature_c": grid["temperature_c"],
+        "precipitation_mm": grid["precipitation_mm"],
+        "weather_code": grid["weather_code"],
+    }).astype(FEATURE_DTYPES)
+    # Clamp to valid range
+    predictions = np.clip(np.asarray(model.predict(features), dtype=float), 0, 100)
+
+    # Apply deterministic opening-hours overlay
+    is_open_values: list[int | str] = []
+    for i, (facility_name, facility_type, ts) in enumerate(zip(grid_names, grid_types, grid["ts"])):
+        is_open_now = is_facility_open(opening_schedules, facility_type, facility_name, ts)
+        if is_open_now is False:
+            predictions[i] = 0.0
+            is_open_values.append(0)
+        elif is_open_now is True:
+            is_open_values.append(1)
+        else:  # None — facility missing from snapshot
+            is_open_values.append("NULL")
+            key = (facility_type, facility_name)
+            if opening_schedules and key not in unknown_facility_warned:
+                logger.warning(
+                    f"No opening hours known for {facility_type}:{facility_name}"
+                )
+                unknown_facility_warned.add(key)
+
+    return pd.DataFrame({
+        "timestamp": grid["timestamp"],
+        "facility_name": grid_names,
+        "facility_type": grid_types,
+        "occupancy_percent": np.round(predictions, 1),
+        "is_open": pd.Series(is_open_values, dtype=object),
+        "hour": grid["hour"],
+        "day_of_week": grid["day_of_week"],
+        "month": grid["month"],
+        "is_weekend": grid["is_weekend"],
+        "is_holiday": grid["is_holiday"],
+        "is_school_vacation": grid["is_school_vacation"],
+        "temperature_c": grid["temperature_c"],
+        "precipitation_mm": grid["precipitation_mm"],
+        "weather_code": grid["weather_code"],
+        "cloud_cover_percent": cloud_cover,
+        "data_source": "forecast",
+    })
+
+
+def save_forecasts(forecasts: pd.DataFrame, output_path: Path) -> None:
+    """Save forecasts to CSV file.
+
+    Expects the frame from ``generate_forecasts``, already in output order.
+    """
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    df = pd.DataFrame(forecasts)
-
     # Define column order to match historical format
     columns = [
         "timestamp", "facility_name", "facility_type", "occupancy_percent",
@@ -277,21 +328,24 @@ def save_forecasts(forecasts: list[dict], output_path: Path) -> None:
         "temperature_c", "precipitation_mm", "weather_code", "cloud_cover_percent",
         "data_source"
     ]
-    df = df[columns]
-
-    # Sort by timestamp, facility_name
-    df = df.sort_values(["timestamp", "facility_name"])
-
-    df.to_csv(output_path, index=False)
+    # pandas' writer is kept on purpose: pyarrow.csv would quote every string
+    # field, churning the committed CSV, for a file of only 48 x N rows
+    forecasts[columns].to_csv(output_path, index=False)
     logger.info(f"Saved {len(forecasts)} forecasts to {output_path}")
 
 
 def main():
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     parser = argparse.ArgumentParser(description="Generate occupancy forecasts")
     parser.add_argument(
         "--model",
         type=str,
-        default="../../models/occupancy_model.pkl",
+        default="../../models/occupancy_model.txt.gz",
         help="Path to trained model"
     )
     parser.add_argument(
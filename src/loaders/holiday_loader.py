@@ -5,20 +5,24 @@ import argparse
 import json
 import logging
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import holidays as holidays_lib
+import numpy as np
 
 TIMEZONE = ZoneInfo("Europe/Berlin")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def _bavaria_holidays(years: tuple[int, ...]) -> tuple[tuple[date, str], ...]:
+    """Expand Bavarian public holidays for *years*, sorted by date (memoized)."""
+    return tuple(sorted(holidays_lib.Germany(prov="BY", years=list(years)).items()))
+
+
 def generate_public_holidays(years: list[int]) -> dict:
     """Generate Bavarian public holidays using holidays package.
 
@@ -28,14 +32,10 @@ def generate_public_holidays(years: list[int]) -> dict:
     Returns:
         Dictionary with holiday data in our schema
     """
-    bavaria_holidays = holidays_lib.Germany(prov="BY", years=years)
-
-    holiday_list = []
-    for dt, name in sorted(bavaria_holidays.items()):
-        holiday_list.append({
-            "date": dt.isoformat(),
-            "name": name
-        })
+    holiday_list = [
+        {"date": dt.isoformat(), "name": name}
+        for dt, name in _bavaria_holidays(tuple(sorted(set(years))))
+    ]
 
     return {
         "generated_at": datetime.now(TIMEZONE).isoformat(),
@@ -45,43 +45,56 @@ def generate_public_holidays(years: list[int]) -> dict:
     }
 
 
+@lru_cache(maxsize=4)
+def _read_public_holidays(path: Path, mtime_ns: int) -> tuple[tuple[date, str], ...]:
+    """Parse public_holidays.json (memoized per path and modification time)."""
+    data = json.loads(path.read_bytes())
+    return tuple(
+        (date.fromisoformat(h["date"]), h["name"])
+        for h in data.get("holidays", [])
+    )
+
+
+@lru_cache(maxsize=4)
+def _read_school_holidays(path: Path, mtime_ns: int) -> tuple[tuple[date, date], ...]:
+    """Parse school_holidays.json (memoized per path and modification time)."""
+    data = json.loads(path.read_bytes())
+    return tuple(
+        (date.fromisoformat(v["start"]), date.fromisoformat(v["end"]))
+        for v in data.get("vacations", [])
+    )
+
+
 def load_public_holidays(path: Path) -> dict[date, str]:
     """Load public holidays from JSON file.
 
+    Repeated loads of an unchanged file in the same process reuse the parsed
+    result; each call still returns a fresh dict.
+
     Args:
         path: Path to public_holidays.json
 
     Returns:
         Dictionary mapping date to holiday name
     """
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
-
-    return {
-        date.fromisoformat(h["date"]): h["name"]
-        for h in data.get("holidays", [])
-    }
+    path = Path(path)
+    return dict(_read_public_holidays(path, path.stat().st_mtime_ns))
 
 
 def load_school_holidays(path: Path) -> list[tuple[date, date]]:
     """Load school vacation date ranges.
 
+    Repeated loads of an unchanged file in the same process reuse the parsed
+    result; each call still returns a fresh list.
+
     Args:
         path: Path to school_holidays.json
 
     Returns:
         List of (start_date, end_date) tuples
     """
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
-
-    vacations = []
-    for v in data.get("vacations", []):
-        start = date.fromisoformat(v["start"])
-        end = date.fromisoformat(v["end"])
-        vacations.append((start, end))
-
-    return vacations
+    path = Path(path)
+    return list(_read_school_holidays(path, path.stat().st_mtime_ns))
 
 
 def is_public_holiday(dt: datetime | date, holidays_dict: dict[date, str]) -> bool:
@@ -98,9 +111,43 @@ def is_public_holiday(dt: datetime | date, holidays_dict: dict[date, str]) -> bo
     return check_date in holidays_dict
 
 
+def school_vacation_mask(days: np.ndarray, vacations: list[tuple[date, date]]) -> np.ndarray:
+    """Flag which days fall within school vacation, vectorized.
+
+    Builds a boolean bitmap over the span covered by *vacations*, indexed by
+    day offset, so each lookup is a single array index.
+
+    Args:
+        days: Array of dates (anything castable to datetime64[D])
+        vacations: List from load_school_holidays()
+
+    Returns:
+        Boolean array, True where the day is within a vacation period
+    """
+    days = np.asarray(days, dtype="datetime64[D]")
+    if not vacations:
+        return np.zeros(days.shape, dtype=bool)
+
+    epoch = np.datetime64(min(start for start, _ in vacations), "D")
+    span = (np.datetime64(max(end for _, end in vacations), "D") - epoch).astype(int) + 1
+    bitmap = np.zeros(span, dtype=bool)
+    for start, end in vacations:
+        first = (np.datetime64(start, "D") - epoch).astype(int)
+        last = (np.datetime64(end, "D") - epoch).astype(int)
+        bitmap[first:last + 1] = True
+
+    offsets = (days - epoch).astype(int)
+    in_span = (offsets >= 0) & (offsets < span)
+    mask = np.zeros(days.shape, dtype=bool)
+    mask[in_span] = bitmap[offsets[in_span]]
+    return mask
+
+
 def is_school_vacation(dt: datetime | date, vacations: list[tuple[date, date]]) -> bool:
     """Check if datetime falls within school vacation.
 
+    For whole columns of dates use school_vacation_mask() instead.
+
     Args:
         dt: Datetime or date to check
         vacations: List from load_school_holidays()
@@ -125,14 +172,20 @@ def save_public_holidays(data: dict, output_path: Path) -> Path:
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Encode in one pass and write once instead of streaming encoder chunks
+    output_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
 
     logger.info(f"Saved public holidays to {output_path}")
     return output_path
 
 
 def main():
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     parser = argparse.ArgumentParser(description="Generate public holidays for Bavaria")
     parser.add_argument(
         "--output",
@@ -0,0 +1,33 @@
+"""ISO 8601 timestamp formatting shared by the transform and forecast pipelines."""
+
+import numpy as np
+import pandas as pd
+
+
+def _format_offset(minutes: int) -> str:
+    """Format a UTC offset in minutes as ISO 8601 (+01:00)."""
+    sign = "+" if minutes >= 0 else "-"
+    hours, mins = divmod(abs(minutes), 60)
+    return f"{sign}{hours:02d}:{mins:02d}"
+
+
+def format_iso_timestamps(ts: pd.Series) -> pd.Series:
+    """Format tz-aware timestamps as ISO 8601 strings with a +HH:MM offset.
+
+    The wall-clock part is rendered by NumPy in one pass (seconds truncated,
+    as strftime's %S does) and the offset is formatted once per distinct
+    value (CET/CEST), so no per-row strftime or regex runs.
+
+    Args:
+        ts: Series of tz-aware timestamps
+
+    Returns:
+        Series of strings like "2026-01-15T10:00:00+01:00"
+    """
+    local = ts.dt.tz_localize(None).to_numpy()
+    utc = ts.dt.tz_convert(None).to_numpy()
+    wall = np.datetime_as_string(local, unit="s")
+    offset_minutes = (local - utc) // np.timedelta64(1, "m")
+    unique_offsets, inverse = np.unique(offset_minutes, return_inverse=True)
+    labels = np.array([_format_offset(int(m)) for m in unique_offsets])
+    return pd.Series(np.char.add(wall, labels[inverse]), index=ts.index)
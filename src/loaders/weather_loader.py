@@ -5,12 +5,13 @@ import argparse
 import json
 import logging
 import sys
-import time
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 TIMEZONE = ZoneInfo("Europe/Berlin")
 
@@ -20,20 +21,54 @@ LONGITUDE = 11.5820
 
 # Open-Meteo API endpoint
 API_URL = "https://api.open-meteo.com/v1/forecast"
+MAX_RETRIES = 3  # attempts per fetch, including the first
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
-def fetch_weather(past_days: int = 7, forecast_days: int = 7) -> dict:
+class _LoggingRetry(Retry):
+    """Retry policy that logs each failed attempt before urllib3 retries it."""
+
+    def increment(self, *args, **kwargs) -> Retry:
+        new_retry = super().increment(*args, **kwargs)
+        response = kwargs.get("response")
+        error = kwargs.get("error")
+        reason = f"HTTP {response.status}" if response is not None else error
+        attempt = len(new_retry.history)
+        logger.warning(
+            f"Attempt {attempt} failed: {reason}. "
+            f"Retrying in {new_retry.get_backoff_time():.0f}s..."
+        )
+        return new_retry
+
+
+def _build_session() -> requests.Session:
+    """Create a pooled session that retries transient failures inside urllib3."""
+    session = requests.Session()
+    retries = _LoggingRetry(
+        total=MAX_RETRIES - 1,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+    )
+    session.mount("https://", HTTPAdapter(max_retries=retries))
+    return session
+
+
+_SESSION = _build_session()
+
+
+def fetch_weather(
+    past_days: int = 7,
+    forecast_days: int = 7,
+    session: requests.Session | None = None,
+) -> dict:
     """Fetch weather data from Open-Meteo API.
 
     Args:
         past_days: Number of historical days to fetch (max 92)
         forecast_days: Number of forecast days to fetch (max 16)
+        session: Session to send the request on (default: the module's
+            pooled session, which retries connection errors and 5xx)
 
     Returns:
         Normalized weather data dictionary
@@ -47,48 +82,51 @@ def fetch_weather(past_days: int = 7, forecast_days: int = 7) -> dict:
         "forecast_days": forecast_days,
     }
 
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(API_URL, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            return _normalize_response(data)
-        except requests.RequestException as e:
-            wait_time = 2 ** attempt  # 1s, 2s, 4s
-            logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {wait_time}s...")
-            if attempt < max_retries - 1:
-                time.sleep(wait_time)
-            else:
-                logger.error(f"All {max_retries} attempts failed")
-                raise
+    try:
+        response = (session or _SESSION).get(API_URL, params=params, timeout=30)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.warning(f"Weather fetch failed after up to {MAX_RETRIES} attempts: {e}")
+        raise
+    return _normalize_response(response.json())
+
+
+def _berlin_iso(ts: str) -> str:
+    """Attach the CET/CEST offset to a naive Berlin local timestamp."""
+    # Open-Meteo returns naive Berlin local times; attach correct CET/CEST offset
+    if "+" not in ts and "-" not in ts[10:]:
+        return datetime.fromisoformat(ts).replace(tzinfo=TIMEZONE).isoformat()
+    return ts
+
+
+def _pad(values: list, n: int) -> list:
+    """Truncate or pad *values* with None to exactly *n* entries."""
+    values = values[:n]
+    return values + [None] * (n - len(values))
 
 
 def _normalize_response(data: dict) -> dict:
     """Convert Open-Meteo response to our schema."""
     hourly = data.get("hourly", {})
     timestamps = hourly.get("time", [])
-    temperatures = hourly.get("temperature_2m", [])
-    precipitations = hourly.get("precipitation", [])
-    weather_codes = hourly.get("weather_code", [])
-    cloud_covers = hourly.get("cloud_cover", [])
-
-    hourly_records = []
-    for i, ts in enumerate(timestamps):
-        # Open-Meteo returns naive Berlin local times; attach correct CET/CEST offset
-        if "+" not in ts and "-" not in ts[10:]:
-            naive_dt = datetime.fromisoformat(ts)
-            berlin_dt = naive_dt.replace(tzinfo=TIMEZONE)
-            ts_iso = berlin_dt.isoformat()
-        else:
-            ts_iso = ts
-        hourly_records.append({
+    n = len(timestamps)
+
+    hourly_records = [
+        {
             "timestamp": ts_iso,
-            "temperature_c": temperatures[i] if i < len(temperatures) else None,
-            "precipitation_mm": precipitations[i] if i < len(precipitations) else None,
-            "weather_code": weather_codes[i] if i < len(weather_codes) else None,
-            "cloud_cover_percent": cloud_covers[i] if i < len(cloud_covers) else None,
-        })
+            "temperature_c": temperature,
+            "precipitation_mm": precipitation,
+            "weather_code": weather_code,
+            "cloud_cover_percent": cloud_cover,
+        }
+        for ts_iso, temperature, precipitation, weather_code, cloud_cover in zip(
+            map(_berlin_iso, timestamps),
+            _pad(hourly.get("temperature_2m", []), n),
+            _pad(hourly.get("precipitation", []), n),
+            _pad(hourly.get("weather_code", []), n),
+            _pad(hourly.get("cloud_cover", []), n),
+        )
+    ]
 
     return {
         "fetched_at": datetime.now(TIMEZONE).isoformat(),
@@ -118,14 +156,20 @@ def save_weather(data: dict, output_dir: Path) -> Path:
     filename = f"weather_{today}.json"
     filepath = output_dir / filename
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Encode in one pass and write once instead of streaming encoder chunks
+    filepath.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
 
     logger.info(f"Saved weather data to {filepath}")
     return filepath
 
 
 def main():
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     parser = argparse.ArgumentParser(description="Fetch weather data from Open-Meteo")
     parser.add_argument(
         "--output-dir",
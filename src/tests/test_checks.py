@@ -1,10 +1,15 @@
 """Tests for data irregularity checks."""
 
+import json
+import os
+import subprocess
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 import pytest
 
+from checks._gh import create_github_issue
 from checks.check_raw_scrapes import (
     check_capacity_changes,
     check_missing_facilities,
@@ -12,37 +17,45 @@ from checks.check_raw_scrapes import (
     check_scrape_gaps,
     extract_facilities_from_scrape,
     parse_capacity,
+    scan_history,
 )
 from checks.check_compiled_data import (
+    TIMEZONE,
     check_extended_zero_occupancy,
     check_invalid_occupancy,
     check_missing_facility_types,
     check_new_facility_types,
+    get_recent_facility_types,
+    load_historical_data,
+    rows_since,
 )
 
 
 class TestParseCapacity:
     """Tests for parse_capacity function."""
 
-    def test_standard_format(self):
-        """Should parse standard format."""
-        assert parse_capacity("57/311 persons") == 311
-
-    def test_singular_person(self):
-        """Should parse singular 'person'."""
-        assert parse_capacity("1/100 person") == 100
-
-    def test_none_input(self):
-        """Should return None for None input."""
-        assert parse_capacity(None) is None
-
-    def test_empty_string(self):
-        """Should return None for empty string."""
-        assert parse_capacity("") is None
-
-    def test_invalid_format(self):
-        """Should return None for invalid format."""
-        assert parse_capacity("not a capacity") is None
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            pytest.param("57/311 persons", 311, id="standard"),
+            pytest.param("1/100 person", 100, id="singular"),
+        ],
+    )
+    def test_parses_capacity(self, raw, expected):
+        """Should parse the total from 'current/total person(s)'."""
+        assert parse_capacity(raw) == expected
+
+    @pytest.mark.parametrize(
+        "raw",
+        [
+            pytest.param(None, id="none"),
+            pytest.param("", id="empty"),
+            pytest.param("not a capacity", id="invalid"),
+        ],
+    )
+    def test_returns_none_for_unparseable(self, raw):
+        """Should return None for missing or malformed input."""
+        assert parse_capacity(raw) is None
 
 
 class TestExtractFacilitiesFromScrape:
@@ -71,12 +84,38 @@ class TestExtractFacilitiesFromScrape:
         }
         facilities = extract_facilities_from_scrape(data)
         assert len(facilities) == 2
-        assert facilities[0]["name"] == "Nordbad"
-        assert facilities[0]["type"] == "pool"
-        assert facilities[0]["capacity"] == 177
-        assert facilities[1]["name"] == "Nordbad Sauna"
-        assert facilities[1]["type"] == "sauna"
-        assert facilities[1]["capacity"] == 146
+        assert facilities[0].name == "Nordbad"
+        assert facilities[0].type == "pool"
+        assert facilities[0].capacity == 177
+        assert facilities[1].name == "Nordbad Sauna"
+        assert facilities[1].type == "sauna"
+        assert facilities[1].capacity == 146
+
+    def test_discovers_unknown_facility_lists(self):
+        """Should still pick up facility lists under keys it does not know."""
+        data = {
+            "scrape_timestamp": "2026-01-17T10:00:00+01:00",
+            "summary": {"total": 1},
+            "climbing_halls": [
+                {"pool_name": "Boulderhalle", "facility_type": "climbing", "raw_occupancy": "5/80 persons"}
+            ],
+        }
+        facilities = extract_facilities_from_scrape(data)
+        assert [(f.type, f.name, f.capacity) for f in facilities] == [
+            ("climbing", "Boulderhalle", 80)
+        ]
+
+    def test_skips_null_facility_list(self):
+        """Should skip a known facility key whose value is null."""
+        data = {
+            "scrape_timestamp": "2026-01-17T10:00:00+01:00",
+            "pools": None,
+            "saunas": [
+                {"pool_name": "Nordbad Sauna", "facility_type": "sauna", "raw_occupancy": "10/146 persons"}
+            ],
+        }
+        facilities = extract_facilities_from_scrape(data)
+        assert [(f.type, f.name) for f in facilities] == [("sauna", "Nordbad Sauna")]
 
 
 class TestCheckMissingFacilities:
@@ -85,16 +124,16 @@ class TestCheckMissingFacilities:
     def test_no_missing_facilities(self):
         """Should return empty list when all facilities present."""
         historical = {("pool", "Nordbad"), ("sauna", "Nordbad Sauna")}
+        # 10 scrapes spread over 2+ hours to meet threshold; one dict per scrape,
+        # since a list repeated with * would share a single timestamp
         scrapes = [
             {
-                "_parsed_timestamp": datetime(2026, 1, 17, 10, 0),
+                "_parsed_timestamp": datetime(2026, 1, 17, 10, 0) + timedelta(minutes=15 * i),
                 "pools": [{"pool_name": "Nordbad", "facility_type": "pool"}],
                 "saunas": [{"pool_name": "Nordbad Sauna", "facility_type": "sauna"}],
             }
-        ] * 10  # 10 scrapes to meet threshold
-        # Set timestamps spread over 2+ hours
-        for i, s in enumerate(scrapes):
-            s["_parsed_timestamp"] = datetime(2026, 1, 17, 10, 0) + timedelta(minutes=15 * i)
+            for i in range(10)
+        ]
 
         issues = check_missing_facilities(scrapes, historical)
         assert issues == []
@@ -194,8 +233,6 @@ class TestCheckScrapeGaps:
 
     def test_detects_gap(self, tmp_path):
         """Should detect gap of 2+ hours."""
-        import json
-
         # Create scrapes with a gap
         scrape1 = {
             "scrape_timestamp": "2026-01-17T10:00:00+01:00",
@@ -213,6 +250,88 @@ class TestCheckScrapeGaps:
         assert len(issues) == 1
         assert "gap" in issues[0].lower()
 
+    def test_reads_times_from_filenames(self, tmp_path):
+        """Should date scrapes by file name without parsing their contents."""
+        for name in ("pool_data_20260117_080000.json", "pool_data_20260117_103000.json"):
+            (tmp_path / name).write_text("not json")
+
+        issues = check_scrape_gaps(tmp_path, datetime(2026, 1, 17))
+        assert issues == ["Scrape gap: 2:30:00 between 08:00 and 10:30"]
+
+    def test_uses_preloaded_scrapes(self, tmp_path):
+        """Should check the given scrapes without reading the directory."""
+        scrapes = [
+            {"_parsed_timestamp": datetime(2026, 1, 17, hour, tzinfo=TIMEZONE)}
+            for hour in (8, 9, 12)
+        ]
+
+        issues = check_scrape_gaps(tmp_path, datetime(2026, 1, 17), scrapes)
+        assert issues == ["Scrape gap: 3:00:00 between 09:00 and 12:00"]
+
+
+class TestScanHistory:
+    """Tests for scan_history function."""
+
+    def _write_scrape(self, scrape_dir, day, pools):
+        ts = datetime.combine(day, datetime.min.time()).replace(hour=10)
+        data = {"scrape_timestamp": ts.isoformat(), "pools": pools}
+        path = scrape_dir / f"pool_data_{day.strftime('%Y%m%d')}_100000.json"
+        path.write_text(json.dumps(data))
+
+    def test_collects_facilities_and_latest_capacity(self, tmp_path):
+        """Should return facilities from all days and the most recent capacity."""
+        today = datetime.now(TIMEZONE).date()
+        self._write_scrape(tmp_path, today - timedelta(days=2), [
+            {"pool_name": "Nordbad", "facility_type": "pool", "raw_occupancy": "10/177 persons"},
+            {"pool_name": "Westbad", "facility_type": "pool", "raw_occupancy": "10/300 persons"},
+        ])
+        self._write_scrape(tmp_path, today - timedelta(days=1), [
+            {"pool_name": "Nordbad", "facility_type": "pool", "raw_occupancy": "10/200 persons"},
+        ])
+
+        facilities, capacities = scan_history(tmp_path, days=30)
+        assert facilities == {("pool", "Nordbad"), ("pool", "Westbad")}
+        assert capacities == {("pool", "Nordbad"): 200, ("pool", "Westbad"): 300}
+
+    def test_reuses_cache_for_unchanged_days(self, tmp_path):
+        """Should take days with the same file names and sizes from the cache."""
+        scrape_dir = tmp_path / "scrapes"
+        scrape_dir.mkdir()
+        cache_path = tmp_path / "history_cache.json"
+        day = datetime.now(TIMEZONE).date() - timedelta(days=1)
+        self._write_scrape(scrape_dir, day, [
+            {"pool_name": "Nordbad", "facility_type": "pool", "raw_occupancy": "10/177 persons"},
+        ])
+        first = scan_history(scrape_dir, days=3, cache_path=cache_path)
+
+        # Same name and size but a new mtime, as after a fresh checkout:
+        # the cached result must be used
+        path = next(scrape_dir.glob("pool_data_*.json"))
+        self._write_scrape(scrape_dir, day, [
+            {"pool_name": "Westbad", "facility_type": "pool", "raw_occupancy": "10/300 persons"},
+        ])
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+
+        assert scan_history(scrape_dir, days=3, cache_path=cache_path) == first
+
+    def test_rescans_changed_days(self, tmp_path):
+        """Should re-parse a day whose files changed size."""
+        scrape_dir = tmp_path / "scrapes"
+        scrape_dir.mkdir()
+        cache_path = tmp_path / "history_cache.json"
+        day = datetime.now(TIMEZONE).date() - timedelta(days=1)
+        self._write_scrape(scrape_dir, day, [
+            {"pool_name": "Nordbad", "facility_type": "pool", "raw_occupancy": "10/177 persons"},
+        ])
+        scan_history(scrape_dir, days=3, cache_path=cache_path)
+        self._write_scrape(scrape_dir, day, [
+            {"pool_name": "Michaelibad", "facility_type": "pool", "raw_occupancy": "10/500 persons"},
+        ])
+
+        facilities, capacities = scan_history(scrape_dir, days=3, cache_path=cache_path)
+        assert facilities == {("pool", "Michaelibad")}
+        assert capacities == {("pool", "Michaelibad"): 500}
+
 
 class TestCheckNewFacilityTypes:
     """Tests for check_new_facility_types function."""
@@ -231,6 +350,38 @@ class TestCheckNewFacilityTypes:
         assert "ice_rink" in issues[0]
 
 
+class TestRowsSince:
+    """Tests for rows_since function."""
+
+    @pytest.mark.parametrize("ascending", [True, False])
+    def test_sorted_and_unsorted_agree(self, ascending):
+        """Should return the same rows whether or not timestamps are sorted."""
+        base = datetime(2026, 1, 17, 10, 0)
+        df = pd.DataFrame({
+            "timestamp": [base + timedelta(hours=i) for i in range(6)],
+            "occupancy_percent": [float(i) for i in range(6)],
+        }).sort_values("timestamp", ascending=ascending)
+
+        result = rows_since(df, base + timedelta(hours=3))
+        assert sorted(result["occupancy_percent"]) == [3.0, 4.0, 5.0]
+
+
+class TestGetRecentFacilityTypes:
+    """Tests for get_recent_facility_types function."""
+
+    def test_categorical_ignores_unobserved_categories(self):
+        """Should only return categories present in the recent window."""
+        now = datetime.now()
+        df = pd.DataFrame({
+            "timestamp": [now - timedelta(days=3), now - timedelta(hours=1)],
+            "facility_type": pd.Categorical(["ice_rink", "pool"]),
+            "facility_name": ["Test", "Test"],
+        })
+
+        assert get_recent_facility_types(df, now=now) == {"pool"}
+        assert get_recent_facility_types(df.astype({"facility_type": object}), now=now) == {"pool"}
+
+
 class TestCheckMissingFacilityTypes:
     """Tests for check_missing_facility_types function."""
 
@@ -251,47 +402,47 @@ class TestCheckMissingFacilityTypes:
 class TestCheckInvalidOccupancy:
     """Tests for check_invalid_occupancy function."""
 
-    def test_detects_over_100(self):
-        """Should detect occupancy over 100%."""
-        df = pd.DataFrame({
+    @pytest.fixture
+    def base_df(self):
+        """Single recent reading; tests override occupancy via assign()."""
+        return pd.DataFrame({
             "timestamp": [datetime.now() - timedelta(hours=1)],
             "facility_type": ["pool"],
             "facility_name": ["Nordbad"],
-            "occupancy_percent": [150.0],
+            "occupancy_percent": [0.0],
         })
 
-        issues = check_invalid_occupancy(df)
+    def test_detects_over_100(self, base_df):
+        """Should detect occupancy over 100%."""
+        issues = check_invalid_occupancy(base_df.assign(occupancy_percent=150.0))
         assert len(issues) == 1
         assert "150" in issues[0]
 
-    def test_ignores_valid(self):
+    def test_ignores_valid(self, base_df):
         """Should not flag valid occupancy."""
-        df = pd.DataFrame({
-            "timestamp": [datetime.now() - timedelta(hours=1)],
-            "facility_type": ["pool"],
-            "facility_name": ["Nordbad"],
-            "occupancy_percent": [85.0],
-        })
-
-        issues = check_invalid_occupancy(df)
+        issues = check_invalid_occupancy(base_df.assign(occupancy_percent=85.0))
         assert issues == []
 
 
 class TestCheckExtendedZeroOccupancy:
     """Tests for check_extended_zero_occupancy function."""
 
+    def _readings(self, occupancy, hour):
+        # Hourly Nordbad readings going back from now, built from typed arrays
+        occupancy = np.asarray(occupancy, dtype=np.float64)
+        n = len(occupancy)
+        return pd.DataFrame({
+            "timestamp": np.datetime64(datetime.now()) - np.arange(n).astype("timedelta64[h]"),
+            "facility_type": np.full(n, "pool"),
+            "facility_name": np.full(n, "Nordbad"),
+            "occupancy_percent": occupancy,
+            "hour": np.full(n, hour, dtype=np.int8),
+        })
+
     def test_detects_extended_zero_daytime(self):
         """Should detect extended zero during daytime."""
-        now = datetime.now()
-        # Create data with 0% for 10 hours during daytime
-        timestamps = [now - timedelta(hours=i) for i in range(10)]
-        df = pd.DataFrame({
-            "timestamp": timestamps,
-            "facility_type": ["pool"] * 10,
-            "facility_name": ["Nordbad"] * 10,
-            "occupancy_percent": [0.0] * 10,
-            "hour": [12] * 10,  # All during daytime
-        })
+        # 0% for 10 hours, all during daytime
+        df = self._readings(np.zeros(10), hour=12)
 
         issues = check_extended_zero_occupancy(df, threshold_hours=8)
         assert len(issues) == 1
@@ -299,30 +450,121 @@ class TestCheckExtendedZeroOccupancy:
 
     def test_ignores_nighttime_zeros(self):
         """Should ignore zeros during nighttime."""
-        now = datetime.now()
-        timestamps = [now - timedelta(hours=i) for i in range(10)]
-        df = pd.DataFrame({
-            "timestamp": timestamps,
-            "facility_type": ["pool"] * 10,
-            "facility_name": ["Nordbad"] * 10,
-            "occupancy_percent": [0.0] * 10,
-            "hour": [3] * 10,  # All during nighttime
-        })
+        df = self._readings(np.zeros(10), hour=3)
 
         issues = check_extended_zero_occupancy(df, threshold_hours=8)
         assert issues == []
 
     def test_ignores_short_zeros(self):
         """Should ignore zeros shorter than threshold."""
+        # Daytime but only 5 hours
+        df = self._readings(np.zeros(5), hour=12)
+
+        issues = check_extended_zero_occupancy(df, threshold_hours=8)
+        assert issues == []
+
+    def test_ignores_interrupted_zeros(self):
+        """Should not join zero runs separated by a non-zero reading."""
+        occupancy = np.zeros(10)
+        occupancy[5] = 20.0  # Splits into two runs shorter than 8 hours
+        df = self._readings(occupancy, hour=12)
+
+        issues = check_extended_zero_occupancy(df, threshold_hours=8)
+        assert issues == []
+
+    def test_separates_interleaved_facilities(self):
+        """Should track runs per facility when readings are interleaved by time."""
         now = datetime.now()
-        timestamps = [now - timedelta(hours=i) for i in range(5)]
+        timestamps = [now - timedelta(hours=i) for i in range(10)]
+        facilities = [("pool", "Nordbad"), ("sauna", "Nordbad"), ("pool", "Westbad")]
+        rows = []
+        for i, ts in enumerate(timestamps):
+            for facility_type, facility_name in facilities:
+                if facility_type == "sauna":
+                    occupancy = 0.0 if i % 2 else 30.0  # Zeros never run back to back
+                elif facility_name == "Westbad":
+                    occupancy = 45.0
+                else:
+                    occupancy = 0.0
+                rows.append((ts, facility_type, facility_name, occupancy, 12))
+        df = pd.DataFrame(
+            rows, columns=["timestamp", "facility_type", "facility_name", "occupancy_percent", "hour"]
+        )
+
+        issues = check_extended_zero_occupancy(df, threshold_hours=8)
+        assert len(issues) == 1
+        assert "pool:Nordbad" in issues[0]
+
+
+class TestLoadHistoricalData:
+    """Tests for load_historical_data function."""
+
+    def _write_csv(self, path, timestamps):
+        rows = [
+            "timestamp,facility_name,facility_type,occupancy_percent,is_open,hour,temperature_c"
+        ]
+        for ts in timestamps:
+            rows.append(f"{ts.isoformat()},Nordbad,pool,50.0,1,{ts.hour},3.5")
+        path.write_text("\n".join(rows) + "\n")
+
+    def test_reads_only_required_columns(self, tmp_path):
+        """Should skip unused columns and use compact dtypes."""
+        csv_path = tmp_path / "occupancy_historical.csv"
+        now = datetime.now(TIMEZONE)
+        self._write_csv(csv_path, [now - timedelta(hours=2), now - timedelta(hours=1)])
+
+        df = load_historical_data(csv_path)
+        assert set(df.columns) == {
+            "timestamp", "facility_type", "facility_name", "occupancy_percent", "hour"
+        }
+        assert isinstance(df["facility_type"].dtype, pd.CategoricalDtype)
+        assert df["occupancy_percent"].dtype == "float32"
+        assert df["hour"].dtype == "int8"
+
+    def test_drops_rows_outside_window(self, tmp_path):
+        """Should keep only rows inside the history window."""
+        csv_path = tmp_path / "occupancy_historical.csv"
+        now = datetime.now(TIMEZONE)
+        self._write_csv(csv_path, [now - timedelta(days=60), now - timedelta(hours=1)])
+
+        df = load_historical_data(csv_path, days=30)
+        assert len(df) == 1
+
+    def test_reads_parquet_window(self, tmp_path):
+        """Should read a Parquet export with the same window and dtypes."""
+        pytest.importorskip("pyarrow")
+        now = datetime.now(TIMEZONE)
         df = pd.DataFrame({
-            "timestamp": timestamps,
-            "facility_type": ["pool"] * 5,
-            "facility_name": ["Nordbad"] * 5,
-            "occupancy_percent": [0.0] * 5,
-            "hour": [12] * 5,  # Daytime but only 5 hours
+            "timestamp": pd.to_datetime([now - timedelta(days=60), now - timedelta(hours=1)]),
+            "facility_name": ["Nordbad", "Nordbad"],
+            "facility_type": ["pool", "pool"],
+            "occupancy_percent": [50.0, 60.0],
+            "hour": [10, 11],
         })
+        parquet_path = tmp_path / "occupancy_historical.parquet"
+        df.to_parquet(parquet_path, index=False)
 
-        issues = check_extended_zero_occupancy(df, threshold_hours=8)
-        assert issues == []
+        result = load_historical_data(parquet_path, days=30)
+        assert result["occupancy_percent"].tolist() == [60.0]
+        assert result["timestamp"].dt.tz is None
+        assert isinstance(result["facility_type"].dtype, pd.CategoricalDtype)
+
+
+class TestCreateGithubIssue:
+    """Tests for create_github_issue function."""
+
+    def test_passes_body_via_file(self, monkeypatch):
+        """Should hand gh a body file instead of the body text."""
+        calls = []
+
+        def fake_run(args, **kwargs):
+            path = args[args.index("--body-file") + 1]
+            with open(path, encoding="utf-8") as f:
+                calls.append((args, f.read()))
+            return subprocess.CompletedProcess(args, 0, stdout="https://example/1\n", stderr="")
+
+        monkeypatch.setattr(subprocess, "run", fake_run)
+        assert create_github_issue("Title", "line\n" * 10_000) is True
+        args, body = calls[0]
+        assert "--body" not in args
+        assert body == "line\n" * 10_000
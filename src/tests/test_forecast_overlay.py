@@ -5,6 +5,9 @@ branches of the is_open precedence table from
 Specs/changes/integrate-opening-hours/architecture.md#overlay-semantics.
 """
 
+import ast
+import json
+import os
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
@@ -12,7 +15,8 @@ from zoneinfo import ZoneInfo
 import pandas as pd
 import pytest
 
-from forecast.forecast import generate_forecasts
+from forecast import forecast as forecast_module
+from forecast.forecast import generate_forecasts, get_facilities
 from loaders.opening_hours_loader import load_latest_snapshot
 
 TIMEZONE = ZoneInfo("Europe/Berlin")
@@ -24,7 +28,7 @@ ALIASES = {"sauna:Nordbad Sauna": "Nordbad"}
 class StubModel:
     """Always predicts 42.0% free, enough to be distinguishable from 0.0."""
     def predict(self, features):
-        return [42.0]
+        return [42.0] * len(features)
 
 
 def _weather_frame(rows):
@@ -56,8 +60,8 @@ def test_closed_hour_emits_is_open_0_and_zero_percent(schedules):
         opening_schedules=schedules,
     )
     assert len(forecasts) == 1
-    assert forecasts[0]["is_open"] == 0
-    assert forecasts[0]["occupancy_percent"] == 0.0
+    assert forecasts.iloc[0]["is_open"] == 0
+    assert forecasts.iloc[0]["occupancy_percent"] == 0.0
 
 
 def test_open_hour_keeps_model_prediction(schedules):
@@ -77,8 +81,8 @@ def test_open_hour_keeps_model_prediction(schedules):
         school_vacations=[],
         opening_schedules=schedules,
     )
-    assert forecasts[0]["is_open"] == 1
-    assert forecasts[0]["occupancy_percent"] == 42.0
+    assert forecasts.iloc[0]["is_open"] == 1
+    assert forecasts.iloc[0]["occupancy_percent"] == 42.0
 
 
 def test_unknown_facility_emits_null_and_keeps_prediction(schedules, caplog):
@@ -98,8 +102,8 @@ def test_unknown_facility_emits_null_and_keeps_prediction(schedules, caplog):
             school_vacations=[],
             opening_schedules=schedules,
         )
-    assert forecasts[0]["is_open"] == "NULL"
-    assert forecasts[0]["occupancy_percent"] == 42.0
+    assert forecasts.iloc[0]["is_open"] == "NULL"
+    assert forecasts.iloc[0]["occupancy_percent"] == 42.0
     assert any(
         "No opening hours known for pool:Ghost Facility" in r.message
         for r in caplog.records
@@ -151,8 +155,8 @@ def test_closed_for_season_always_closed(schedules):
         school_vacations=[],
         opening_schedules=schedules,
     )
-    assert all(f["is_open"] == 0 for f in forecasts)
-    assert all(f["occupancy_percent"] == 0.0 for f in forecasts)
+    assert (forecasts["is_open"] == 0).all()
+    assert (forecasts["occupancy_percent"] == 0.0).all()
 
 
 def test_empty_schedule_falls_back_to_null_without_warning(schedules):
@@ -172,5 +176,60 @@ def test_empty_schedule_falls_back_to_null_without_warning(schedules):
         school_vacations=[],
         opening_schedules={},  # no snapshot
     )
-    assert forecasts[0]["is_open"] == "NULL"
-    assert forecasts[0]["occupancy_percent"] == 42.0
+    assert forecasts.iloc[0]["is_open"] == "NULL"
+    assert forecasts.iloc[0]["occupancy_percent"] == 42.0
+
+
+
+def test_missing_weather_code_passes_nan_to_model(schedules):
+    """An hour without a weather_code (padded None) reaches the model as NaN."""
+    class CapturingModel(StubModel):
+        def predict(self, features):
+            self.features = features
+            return super().predict(features)
+
+    weather = _weather_frame([
+        {
+            "timestamp": datetime(2026, 4, 20, 12, 0, tzinfo=TIMEZONE),
+            "temperature_c": 10.0, "precipitation_mm": 0.0,
+            "weather_code": 3, "cloud_cover_percent": 20.0,
+        },
+        {
+            "timestamp": datetime(2026, 4, 20, 13, 0, tzinfo=TIMEZONE),
+            "temperature_c": 10.0, "precipitation_mm": 0.0,
+            "weather_code": None, "cloud_cover_percent": None,
+        },
+    ])
+    model = CapturingModel()
+    forecasts = generate_forecasts(
+        model=model,
+        facility_types=[("Nordbad", "pool")],
+        weather_df=weather,
+        public_holidays=set(),
+        school_vacations=[],
+        opening_schedules=schedules,
+    )
+    assert len(forecasts) == 2
+    assert model.features["weather_code"].iloc[0] == 3
+    assert pd.isna(model.features["weather_code"].iloc[1])
+
+
+def test_get_facilities_rereads_edited_config(tmp_path):
+    """An edit to facility_types.json is seen despite the memoized parse."""
+    path = tmp_path / "facility_types.json"
+    path.write_text(json.dumps({"pool:Nordbad": "pool"}))
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert get_facilities(path) == [("Nordbad", "pool")]
+
+    path.write_text(json.dumps({"pool:Nordbad": "pool", "sauna:Nordbad Sauna": "sauna"}))
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert get_facilities(path) == [("Nordbad", "pool"), ("Nordbad Sauna", "sauna")]
+
+def test_forecast_module_avoids_iterrows():
+    """The batched forecast path must not fall back to DataFrame.iterrows."""
+    tree = ast.parse(Path(forecast_module.__file__).read_text(encoding="utf-8"))
+    calls = [
+        node.lineno for node in ast.walk(tree)
+        if isinstance(node, ast.Attribute) and node.attr == "iterrows"
+    ]
+    assert calls == []
@@ -0,0 +1,38 @@
+"""Tests for holiday loader module."""
+
+import json
+import os
+from datetime import date, datetime
+
+from loaders.holiday_loader import is_school_vacation, load_public_holidays
+
+
+class TestLoadPublicHolidays:
+    """Tests for load_public_holidays function."""
+
+    def _write(self, path, holidays, mtime_ns):
+        path.write_text(json.dumps({"holidays": holidays}))
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        """Cached parses are reused per mtime; a rewritten file is read again."""
+        path = tmp_path / "public_holidays.json"
+        self._write(path, [{"date": "2026-01-01", "name": "Neujahr"}], 1_000_000_000)
+
+        first = load_public_holidays(path)
+        first[date(2026, 1, 6)] = "mutated by caller"
+        assert load_public_holidays(path) == {date(2026, 1, 1): "Neujahr"}
+
+        self._write(path, [{"date": "2026-01-06", "name": "Heilige Drei Könige"}], 2_000_000_000)
+        assert load_public_holidays(path) == {date(2026, 1, 6): "Heilige Drei Könige"}
+
+
+class TestIsSchoolVacation:
+    """Tests for is_school_vacation function."""
+
+    def test_checks_periods_inclusively(self):
+        """Should accept load_school_holidays() periods and include both ends."""
+        vacations = [(date(2026, 2, 16), date(2026, 2, 20))]
+        assert is_school_vacation(datetime(2026, 2, 16, 8, 0), vacations)
+        assert is_school_vacation(date(2026, 2, 20), vacations)
+        assert not is_school_vacation(date(2026, 2, 21), vacations)
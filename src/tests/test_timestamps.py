@@ -0,0 +1,23 @@
+"""Tests for timestamps module."""
+
+import pandas as pd
+
+from loaders.timestamps import format_iso_timestamps
+
+
+class TestFormatIsoTimestamps:
+    """Tests for format_iso_timestamps function."""
+
+    def test_formats_both_offsets_and_truncates_seconds(self):
+        """Should match strftime output with a colon in the offset, across DST."""
+        ts = pd.Series(pd.to_datetime([
+            "2026-03-29 01:59:59.900", "2026-03-29 03:00:00.000", "2026-10-25 12:15:30.250",
+        ]).tz_localize("Europe/Berlin"))
+
+        result = format_iso_timestamps(ts)
+
+        assert list(result) == [
+            "2026-03-29T01:59:59+01:00",
+            "2026-03-29T03:00:00+02:00",
+            "2026-10-25T12:15:30+01:00",
+        ]
@@ -1,5 +1,6 @@
 """Tests for transform module."""
 
+import json
 from datetime import datetime
 from pathlib import Path
 
@@ -7,7 +8,15 @@ import pandas as pd
 import pytest
 
 from loaders.opening_hours_loader import load_latest_snapshot
-from transform import apply_opening_hours_overlay, resolve_facility_alias
+from transform import (
+    apply_opening_hours_overlay,
+    drop_adjacent_duplicates,
+    group_aliases_by_type,
+    load_existing_data,
+    load_pool_data,
+    merge_features,
+    resolve_facility_alias,
+)
 
 FIXTURE_DIR = Path(__file__).parent / "fixtures"
 
@@ -47,6 +56,28 @@ class TestResolveFacilityAlias:
         assert result == "Dantebad Sauna"
 
 
+class TestGroupAliasesByType:
+    """Tests for group_aliases_by_type function."""
+
+    def test_lookup_matches_resolve_facility_alias(self):
+        """Two-level lookup should resolve exactly like the composite key."""
+        aliases = {
+            "sauna:Dantebad Sauna": "Dantebad",
+            "sauna:Nordbad Sauna": "Nordbad",
+            "pool:Old:Name": "New Name",
+        }
+        by_type = group_aliases_by_type(aliases)
+        cases = [
+            ("Dantebad Sauna", "sauna"),
+            ("Nordbad Sauna", "pool"),
+            ("Old:Name", "pool"),
+            ("Westbad", "ice_rink"),
+        ]
+        for name, fac_type in cases:
+            expected = resolve_facility_alias(name, fac_type, aliases)
+            assert by_type.get(fac_type, {}).get(name, name) == expected
+
+
 class TestApplyOpeningHoursOverlay:
     """Tests for apply_opening_hours_overlay function."""
 
@@ -157,3 +188,110 @@ class TestApplyOpeningHoursOverlay:
         result = apply_opening_hours_overlay(df, schedules={})
         assert result.iloc[0]["is_open"] == 1
         assert result.iloc[0]["occupancy_percent"] == 100.0
+
+
+class TestMergeFeatures:
+    """Tests for merge_features function."""
+
+    def test_joins_weather_for_containing_hour(self):
+        """Readings get the weather of their hour; hours without weather stay NaN."""
+        pool_df = pd.DataFrame({
+            "timestamp": pd.to_datetime(["2026-01-15 10:15", "2026-01-15 10:45", "2026-01-15 12:00"]),
+            "facility_name": ["Nordbad"] * 3,
+            "facility_type": ["pool"] * 3,
+        })
+        weather_df = pd.DataFrame(
+            {
+                "temperature_c": [1.5, 2.5],
+                "precipitation_mm": [0.0, 0.2],
+                "weather_code": [3, 61],
+                "cloud_cover_percent": [80, 100],
+            },
+            index=pd.to_datetime(["2026-01-15 10:00", "2026-01-15 11:00"]),
+        )
+
+        result = merge_features(pool_df, weather_df, {}, [])
+
+        assert list(result["temperature_c"].iloc[:2]) == [1.5, 1.5]
+        assert result["weather_code"].iloc[0] == 3.0
+        assert result[["temperature_c", "weather_code"]].iloc[2].isna().all()
+        assert list(result["facility_name"]) == ["Nordbad"] * 3
+
+
+class TestLoadPoolData:
+    """Tests for load_pool_data function."""
+
+    def _write_scrape(self, pool_dir, scrape_time):
+        ts = scrape_time.isoformat() + "+02:00"
+        data = {
+            "scrape_timestamp": ts,
+            "pools": [{
+                "pool_name": "Nordbad", "facility_type": "pool", "timestamp": ts,
+                "occupancy_percent": 40.0, "is_open": True,
+                "hour": scrape_time.hour, "day_of_week": 2, "is_weekend": False,
+            }],
+        }
+        path = pool_dir / scrape_time.strftime("pool_data_%Y%m%d_%H%M%S.json")
+        path.write_text(json.dumps(data))
+        return path
+
+    def test_loaded_and_empty_frames_share_schema(self, tmp_path):
+        """An empty directory yields a zero-row frame typed like a loaded one."""
+        empty = load_pool_data(tmp_path / "missing")
+        self._write_scrape(tmp_path, datetime(2026, 7, 1, 9, 45))
+        loaded = load_pool_data(tmp_path)
+
+        assert empty.empty
+        assert {col: dtype.name for col, dtype in empty.dtypes.items()} == {
+            col: dtype.name for col, dtype in loaded.dtypes.items()
+        }
+
+    def test_skips_old_files_by_name(self, tmp_path, caplog):
+        """Files named well before since are not opened; newer ones are filtered exactly."""
+        # Unparseable, so opening it would log a warning
+        (tmp_path / "pool_data_20260601_100000.json").write_text("{not json")
+        self._write_scrape(tmp_path, datetime(2026, 7, 1, 9, 45))
+        self._write_scrape(tmp_path, datetime(2026, 7, 1, 10, 15))
+
+        df = load_pool_data(tmp_path, since=datetime(2026, 7, 1, 10, 0))
+
+        assert list(df["timestamp"]) == [pd.Timestamp(2026, 7, 1, 10, 15)]
+        assert "Skipping invalid file" not in caplog.text
+
+
+class TestDropAdjacentDuplicates:
+    """Tests for drop_adjacent_duplicates function."""
+
+    def test_matches_drop_duplicates_keep_last(self):
+        """On sorted input, the later copy of each key wins."""
+        df = pd.DataFrame({
+            "timestamp": pd.to_datetime(["2026-01-15 10:00"] * 4 + ["2026-01-15 10:15"]),
+            "facility_name": ["Nordbad", "Nordbad", "Nordbad", "Westbad", "Nordbad"],
+            "facility_type": ["pool", "pool", "sauna", "pool", "pool"],
+            "occupancy_percent": [10.0, 20.0, 30.0, 40.0, 50.0],
+        })
+        keys = ["timestamp", "facility_name", "facility_type"]
+
+        result = drop_adjacent_duplicates(df, keys)
+
+        pd.testing.assert_frame_equal(result, df.drop_duplicates(subset=keys, keep="last"))
+        assert list(result["occupancy_percent"]) == [20.0, 30.0, 40.0, 50.0]
+
+
+class TestLoadExistingData:
+    """Tests for load_existing_data function."""
+
+    def test_reads_parquet_as_naive_berlin_time(self, tmp_path):
+        """A .parquet output is read back with naive Berlin wall-clock timestamps."""
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "occupancy_historical.parquet"
+        pd.DataFrame({
+            "timestamp": pd.to_datetime(["2026-03-29 01:30", "2026-03-29 03:30"]).tz_localize("Europe/Berlin"),
+            "facility_name": ["Nordbad", "Nordbad"],
+            "facility_type": ["pool", "pool"],
+        }).to_parquet(path, index=False)
+
+        df = load_existing_data(path)
+
+        assert df["timestamp"].dt.tz is None
+        assert list(df["timestamp"]) == [pd.Timestamp("2026-03-29 01:30"), pd.Timestamp("2026-03-29 03:30")]
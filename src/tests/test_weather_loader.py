@@ -0,0 +1,51 @@
+"""Tests for weather loader module."""
+
+import pytest
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+
+from loaders.weather_loader import MAX_RETRIES, _build_session, _normalize_response
+
+
+class TestNormalizeResponse:
+    """Tests for _normalize_response function."""
+
+    def test_attaches_berlin_offset(self):
+        """Should attach CET in winter and CEST in summer."""
+        data = {"hourly": {"time": ["2026-01-15T12:00", "2026-07-15T12:00"]}}
+        hourly = _normalize_response(data)["hourly"]
+        assert hourly[0]["timestamp"] == "2026-01-15T12:00:00+01:00"
+        assert hourly[1]["timestamp"] == "2026-07-15T12:00:00+02:00"
+
+    def test_pads_short_series(self):
+        """Should fill missing trailing values with None."""
+        data = {"hourly": {
+            "time": ["2026-01-15T12:00", "2026-01-15T13:00"],
+            "temperature_2m": [3.5],
+            "precipitation": [0.0, 0.2],
+        }}
+        hourly = _normalize_response(data)["hourly"]
+        assert [h["temperature_c"] for h in hourly] == [3.5, None]
+        assert [h["precipitation_mm"] for h in hourly] == [0.0, 0.2]
+        assert hourly[1]["cloud_cover_percent"] is None
+
+
+class TestBuildSession:
+    """Tests for the weather session's retry policy."""
+
+    def test_retries_match_max_retries(self):
+        """Should allow MAX_RETRIES attempts in total, counting the first."""
+        retries = _build_session().get_adapter("https://").max_retries
+        assert retries.total == MAX_RETRIES - 1
+
+    def test_logs_each_retry(self, caplog):
+        """Should warn for every retried attempt until retries run out."""
+        retries = _build_session().get_adapter("https://").max_retries
+        error = ConnectTimeoutError("timed out")
+
+        with caplog.at_level("WARNING"), pytest.raises(MaxRetryError):
+            for _ in range(MAX_RETRIES):
+                retries = retries.increment(method="GET", url="/v1/forecast", error=error)
+
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == MAX_RETRIES - 1
+        assert messages[0].startswith("Attempt 1 failed: timed out")
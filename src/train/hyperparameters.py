@@ -9,6 +9,7 @@ LIGHTGBM_PARAMS = {
     "feature_fraction": 0.9,
     "bagging_fraction": 0.8,
     "bagging_freq": 5,
+    "max_bin": 127,  # Features are int8 flags and 0.1-step weather; 127 bins lose nothing
     "verbose": -1,
 }
 
@@ -2,14 +2,14 @@
 """Train LightGBM model for facility occupancy prediction."""
 
 import argparse
+import gzip
 import logging
-import pickle
 import sys
 from pathlib import Path
 
 import lightgbm as lgb
+import numpy as np
 import pandas as pd
-from sklearn.metrics import mean_absolute_error
 
 from hyperparameters import (
     CATEGORICAL_FEATURES,
@@ -20,37 +20,98 @@ from hyperparameters import (
     VALIDATION_SPLIT,
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
+# Reader schema: only the columns training touches, typed at parse time
+TRAINING_DTYPES = {
+    "facility_name": "category",
+    "is_open": "int8",
+    "hour": "int8",
+    "day_of_week": "int8",
+    "month": "int8",
+    "is_weekend": "int8",
+    "is_holiday": "int8",
+    "is_school_vacation": "int8",
+    "temperature_c": "float32",
+    "precipitation_mm": "float32",
+    # Written as floats ("3.0") and may be empty when weather was missing
+    "weather_code": "float32",
+    TARGET_COLUMN: "float32",
+}
+TRAINING_COLUMNS = ["timestamp", *TRAINING_DTYPES]
+
+# Validation rows scored per predict() call; bounds the prediction buffer
+PREDICT_CHUNK_ROWS = 1_000_000
+
 
 def load_data(data_path: Path) -> pd.DataFrame:
     """Load and prepare training data."""
-    df = pd.read_csv(data_path)
+    df = pd.read_csv(data_path, usecols=TRAINING_COLUMNS, dtype=TRAINING_DTYPES, engine="c")
     logger.info(f"Loaded {len(df)} rows from {data_path}")
 
-    # Convert facility to categorical
-    df["facility"] = df["facility_name"].astype("category")
+    # Parse via UTC to handle mixed offsets (CET +01:00 / CEST +02:00)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, format="ISO8601")
+
+    # facility_name is dictionary-encoded by the reader (category dtype), so
+    # the model's categorical feature is just a rename, not a second column
+    df = df.rename(columns={"facility_name": "facility"})
 
-    # Keep only rows where facility is open
-    df = df[df["is_open"] == 1].copy()
+    # Keep only rows where facility is open; train_model selects its train and
+    # validation rows with take(), which allocates fresh frames, so no
+    # defensive copy is needed here
+    df = df.loc[df["is_open"].to_numpy() == 1].drop(columns="is_open")
     logger.info(f"Filtered to {len(df)} rows where facility is open")
 
     return df
 
 
+def validation_mae(
+    model: lgb.Booster, X: pd.DataFrame, y: pd.Series, chunk_rows: int = PREDICT_CHUNK_ROWS
+) -> float:
+    """Mean absolute error of the model on (X, y), scored in row chunks.
+
+    Only a running sum is kept, so no full-length prediction array is built.
+
+    Args:
+        model: Trained booster
+        X: Feature frame
+        y: Target values aligned with X
+        chunk_rows: Rows passed to each predict() call
+
+    Returns:
+        Mean absolute error, or NaN for an empty frame
+    """
+    target = y.to_numpy(dtype=np.float64)
+    total = 0.0
+    for start in range(0, len(X), chunk_rows):
+        pred = model.predict(X.iloc[start:start + chunk_rows])
+        total += float(np.abs(target[start:start + chunk_rows] - pred).sum())
+    return total / len(X) if len(X) else float("nan")
+
+
 def train_model(df: pd.DataFrame) -> tuple[lgb.Booster, float]:
-    """Train LightGBM model with time-based split."""
-    # Sort by timestamp for time-based split
-    df = df.sort_values("timestamp").reset_index(drop=True)
+    """Train LightGBM model with time-based split.
+
+    The caller hands over ``df`` without keeping a reference of its own, so
+    the frame is freed once the training Dataset is binned.
 
-    # Split: last 10% for validation
+    Raises:
+        ValueError: If ``df`` has no rows
+    """
+    if df.empty:
+        raise ValueError("No training data available")
+
+    # Split: last 10% by time for validation. argpartition selects the
+    # newest rows in O(n); only the small validation tail gets sorted, and
+    # training rows keep their file order.
+    ts = df["timestamp"].dt.tz_convert(None).to_numpy()
     split_idx = int(len(df) * (1 - VALIDATION_SPLIT))
-    train_df = df.iloc[:split_idx]
-    val_df = df.iloc[split_idx:]
+    order = np.argpartition(ts, split_idx)
+    train_idx = np.sort(order[:split_idx])
+    val_idx = order[split_idx:]
+    val_idx = val_idx[np.argsort(ts[val_idx], kind="stable")]
+    train_df = df.take(train_idx)
+    val_df = df.take(val_idx)
 
     logger.info(f"Train set: {len(train_df)} rows, Validation set: {len(val_df)} rows")
 
@@ -61,13 +122,21 @@ def train_model(df: pd.DataFrame) -> tuple[lgb.Booster, float]:
 
     train_data = lgb.Dataset(
         X_train, label=y_train,
-        categorical_feature=CATEGORICAL_FEATURES
+        categorical_feature=CATEGORICAL_FEATURES,
+        params=LIGHTGBM_PARAMS,
+        free_raw_data=True,
     )
     val_data = lgb.Dataset(
         X_val, label=y_val,
         categorical_feature=CATEGORICAL_FEATURES,
-        reference=train_data
+        reference=train_data,
+        params=LIGHTGBM_PARAMS,
+        free_raw_data=True,
     )
+    # Bin the training rows now so the raw frame can go before boosting;
+    # X_val stays for the MAE below
+    train_data.construct()
+    del df, train_df, X_train, y_train
 
     model = lgb.train(
         LIGHTGBM_PARAMS,
@@ -77,22 +146,34 @@ def train_model(df: pd.DataFrame) -> tuple[lgb.Booster, float]:
         callbacks=[lgb.log_evaluation(period=20)],
     )
 
-    # Calculate MAE on validation set
-    y_pred = model.predict(X_val)
-    mae = mean_absolute_error(y_val, y_pred)
+    mae = validation_mae(model, X_val, y_val)
 
     return model, mae
 
 
 def save_model(model: lgb.Booster, output_path: Path) -> None:
-    """Save trained model to pickle file."""
+    """Save trained model in LightGBM's native text format.
+
+    A ``.gz`` path gets the same text gzip-compressed (about a third of the
+    size); it is written with a fixed mtime so retraining an identical
+    model does not produce a new file.
+    """
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "wb") as f:
-        pickle.dump(model, f)
+    if output_path.suffix == ".gz":
+        data = model.model_to_string().encode()
+        output_path.write_bytes(gzip.compress(data, mtime=0))
+    else:
+        model.save_model(str(output_path))
     logger.info(f"Model saved to {output_path}")
 
 
 def main():
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     parser = argparse.ArgumentParser(description="Train occupancy prediction model")
     parser.add_argument(
         "--data",
@@ -103,7 +184,7 @@ def main():
     parser.add_argument(
         "--output",
         type=str,
-        default="../../models/occupancy_model.pkl",
+        default="../../models/occupancy_model.txt.gz",
         help="Path to save trained model"
     )
 
@@ -116,14 +197,13 @@ def main():
         logger.error(f"Data file not found: {data_path}")
         sys.exit(1)
 
-    df = load_data(data_path)
-
-    if len(df) == 0:
-        logger.error("No training data available")
-        sys.exit(1)
-
     logger.info("Training model...")
-    model, mae = train_model(df)
+    try:
+        # Pass the frame straight through so train_model holds its only reference
+        model, mae = train_model(load_data(data_path))
+    except ValueError as e:
+        logger.error(f"Training failed: {e}")
+        sys.exit(1)
 
     logger.info(f"Validation MAE: {mae:.2f} percentage points")
 
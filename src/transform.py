@@ -2,32 +2,41 @@
 """Data transformation pipeline for pool occupancy with weather and holiday features."""
 
 import argparse
+import bisect
 import json
 import logging
 import sys
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 
 from loaders.holiday_loader import (
-    is_public_holiday,
-    is_school_vacation,
     load_public_holidays,
     load_school_holidays,
+    school_vacation_mask,
 )
 from loaders.opening_hours_loader import (
     is_facility_open,
     load_latest_snapshot,
 )
+from loaders.timestamps import format_iso_timestamps
 
 TIMEZONE = ZoneInfo("Europe/Berlin")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Compact dtypes for the pool frame: 0/1 flags and small calendar ints fit in
+# int8, and the few distinct facility names/types are dictionary-encoded
+FLAG_COLUMNS = ["is_open", "is_weekend"]
+SMALL_INT_COLUMNS = ["hour", "day_of_week"]
+CATEGORY_COLUMNS = ["facility_name", "facility_type"]
+
+# A reading is unique per timestamp and facility (same name can be pool and sauna)
+RECORD_KEYS = ["timestamp", "facility_name", "facility_type"]
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,8 +52,14 @@ def load_facility_aliases(config_dir: Path) -> dict:
     aliases_path = config_dir / "facility_aliases.json"
     if not aliases_path.exists():
         raise FileNotFoundError(f"Facility aliases file not found: {aliases_path}")
-    with open(aliases_path, encoding="utf-8") as f:
-        return json.load(f)
+    # Fresh dict per call; the parse itself is shared while the file is unchanged
+    return dict(_read_aliases(aliases_path, aliases_path.stat().st_mtime_ns))
+
+
+@lru_cache(maxsize=4)
+def _read_aliases(path: Path, mtime_ns: int) -> tuple[tuple[str, str], ...]:
+    """Parse facility_aliases.json (memoized per path and modification time)."""
+    return tuple(json.loads(path.read_bytes()).items())
 
 
 def resolve_facility_alias(facility_name: str, facility_type: str, aliases: dict) -> str:
@@ -62,6 +77,177 @@ def resolve_facility_alias(facility_name: str, facility_type: str, aliases: dict
     return aliases.get(key, facility_name)
 
 
+# Columns and dtypes load_pool_data returns (also for an empty result)
+POOL_SCHEMA = {
+    "timestamp": "datetime64[us]",
+    "facility_name": "category",
+    "facility_type": "category",
+    "occupancy_percent": "float64",
+    "is_open": "int8",
+    "hour": "int8",
+    "day_of_week": "int8",
+    "is_weekend": "int8",
+}
+POOL_COLUMNS = list(POOL_SCHEMA)
+WEATHER_COLUMNS = [
+    "weather_hour", "temperature_c", "precipitation_mm", "weather_code", "cloud_cover_percent",
+]
+
+# Scrape file names carry the Berlin local scrape time (within a second of
+# scrape_timestamp); the margin also covers the repeated hour at the DST switch
+FILENAME_TIME_FORMAT = "pool_data_%Y%m%d_%H%M%S"
+FILENAME_SKIP_MARGIN = timedelta(hours=1)
+
+# Below this many files, worker start-up costs more than parsing serially
+PARALLEL_MIN_FILES = 64
+PARALLEL_CHUNKSIZE = 16
+
+
+def group_aliases_by_type(aliases: dict) -> dict[str, dict[str, str]]:
+    """Split "{type}:{old_name}" alias keys into one name map per facility type.
+
+    Lets the per-record lookup be two dict probes instead of building the
+    composite key string each time (same result as resolve_facility_alias).
+
+    Args:
+        aliases: Dictionary mapping "{type}:{old_name}" to canonical name
+
+    Returns:
+        Dictionary mapping type to {old_name: canonical name}
+    """
+    by_type = {}
+    for key, canonical in aliases.items():
+        fac_type, _, name = key.partition(":")
+        by_type.setdefault(fac_type, {})[name] = canonical
+    return by_type
+
+
+def _parse_pool_file(
+    filepath: Path, since: datetime | None, aliases_by_type: dict[str, dict[str, str]]
+) -> tuple[list[list] | None, str | None]:
+    """Parse one scrape file into per-column lists (see POOL_COLUMNS).
+
+    Runs in worker processes, so problems are returned rather than logged.
+
+    Returns:
+        Tuple of (column lists, or None if the file was skipped or invalid;
+        warning message, or None)
+    """
+    try:
+        # Decode straight from bytes; skips the text-mode decoding layer
+        data = json.loads(filepath.read_bytes())
+    except json.JSONDecodeError as e:
+        return None, f"Skipping invalid file {filepath}: {e}"
+
+    # Extract timestamp from file for filtering
+    scrape_ts = data.get("scrape_timestamp")
+    if since and scrape_ts:
+        file_dt = datetime.fromisoformat(scrape_ts.replace("Z", "+00:00"))
+        if file_dt.replace(tzinfo=None) < since.replace(tzinfo=None):
+            return None, None
+
+    # One list per output column; appending scalars avoids a dict per record
+    columns = [[] for _ in POOL_COLUMNS]
+    timestamps, names, types, occupancy, is_open, hours, days_of_week, is_weekend = columns
+
+    no_aliases = {}
+    # Process all facility types (pools, saunas, ice_rinks, etc.)
+    # Dynamically find all keys containing facility data (lists of dicts with facility_type)
+    for key, value in data.items():
+        if not isinstance(value, list) or not value:
+            continue
+        # Check if this looks like facility data (first item has facility_type)
+        if isinstance(value[0], dict) and "facility_type" in value[0]:
+            for facility in value:
+                raw_name = facility.get("pool_name")
+                fac_type = facility.get("facility_type")
+                timestamps.append(facility.get("timestamp"))
+                names.append(aliases_by_type.get(fac_type, no_aliases).get(raw_name, raw_name))
+                types.append(fac_type)
+                occupancy.append(facility.get("occupancy_percent"))
+                is_open.append(1 if facility.get("is_open") else 0)
+                hours.append(facility.get("hour"))
+                days_of_week.append(facility.get("day_of_week"))
+                is_weekend.append(1 if facility.get("is_weekend") else 0)
+
+    return columns, None
+
+
+def _parse_weather_file(filepath: Path) -> tuple[list[list] | None, str | None]:
+    """Parse one weather file into per-column lists (see WEATHER_COLUMNS).
+
+    Returns:
+        Tuple of (column lists, or None if the file was invalid;
+        warning message, or None)
+    """
+    try:
+        data = json.loads(filepath.read_bytes())
+    except json.JSONDecodeError as e:
+        return None, f"Skipping invalid weather file {filepath}: {e}"
+
+    columns = [[] for _ in WEATHER_COLUMNS]
+    hours, temperature, precipitation, codes, cloud_cover = columns
+    for hour_data in data.get("hourly", []):
+        hours.append(hour_data.get("timestamp"))
+        temperature.append(hour_data.get("temperature_c"))
+        precipitation.append(hour_data.get("precipitation_mm"))
+        codes.append(hour_data.get("weather_code"))
+        cloud_cover.append(hour_data.get("cloud_cover_percent"))
+    return columns, None
+
+
+def _parse_files(parse, json_files: list[Path], column_names: list[str]) -> dict[str, list]:
+    """Run *parse* over every file and concatenate the column lists in file order.
+
+    Files are independent, so larger batches are parsed in worker processes.
+
+    Args:
+        parse: Picklable callable mapping a path to (column lists, warning)
+        json_files: Files to parse, in output order
+        column_names: Names for the column lists *parse* returns
+
+    Returns:
+        Dict mapping each column name to its concatenated values
+    """
+    if len(json_files) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(parse, json_files, chunksize=PARALLEL_CHUNKSIZE))
+    else:
+        results = [parse(filepath) for filepath in json_files]
+
+    merged = [[] for _ in column_names]
+    for columns, warning in results:
+        if warning:
+            logger.warning(warning)
+        if columns:
+            for target, values in zip(merged, columns):
+                target.extend(values)
+    return dict(zip(column_names, merged))
+
+
+def _files_since(json_files: list[Path], since: datetime) -> list[Path]:
+    """Drop scrape files named well before *since* without opening them.
+
+    Only a conservative prefix is dropped; files near the cutoff are still
+    filtered exactly on their scrape_timestamp by _parse_pool_file().
+
+    Args:
+        json_files: pool_data_*.json files sorted by name (i.e. by time)
+        since: Naive Berlin-local cutoff
+
+    Returns:
+        The suffix of json_files that may contain data at or after since
+    """
+    cutoff = (since.replace(tzinfo=None) - FILENAME_SKIP_MARGIN).strftime(FILENAME_TIME_FORMAT)
+    start = bisect.bisect_left([filepath.name for filepath in json_files], cutoff)
+    return json_files[start:]
+
+
+def _empty_pool_df() -> pd.DataFrame:
+    """Zero-row pool frame with the same columns and dtypes as a loaded one."""
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in POOL_SCHEMA.items()})
+
+
 def load_pool_data(input_dir: Path, since: datetime = None, aliases: dict = None) -> pd.DataFrame:
     """Load pool JSON files into a DataFrame.
 
@@ -80,53 +266,27 @@ def load_pool_data(input_dir: Path, since: datetime = None, aliases: dict = None
 
     if not json_files:
         logger.warning(f"No pool data files found in {input_dir}")
-        return pd.DataFrame()
-
-    records = []
-    for filepath in json_files:
-        try:
-            with open(filepath, encoding="utf-8") as f:
-                data = json.load(f)
-
-            # Extract timestamp from file for filtering
-            scrape_ts = data.get("scrape_timestamp")
-            if since and scrape_ts:
-                file_dt = datetime.fromisoformat(scrape_ts.replace("Z", "+00:00"))
-                if file_dt.replace(tzinfo=None) < since.replace(tzinfo=None):
-                    continue
-
-            # Process all facility types (pools, saunas, ice_rinks, etc.)
-            # Dynamically find all keys containing facility data (lists of dicts with facility_type)
-            for key, value in data.items():
-                if not isinstance(value, list) or not value:
-                    continue
-                # Check if this looks like facility data (first item has facility_type)
-                if isinstance(value[0], dict) and "facility_type" in value[0]:
-                    for facility in value:
-                        raw_name = facility.get("pool_name")
-                        fac_type = facility.get("facility_type")
-                        canonical_name = resolve_facility_alias(raw_name, fac_type, aliases)
-                        records.append({
-                            "timestamp": facility.get("timestamp"),
-                            "facility_name": canonical_name,
-                            "facility_type": fac_type,
-                            "occupancy_percent": facility.get("occupancy_percent"),
-                            "is_open": 1 if facility.get("is_open") else 0,
-                            "hour": facility.get("hour"),
-                            "day_of_week": facility.get("day_of_week"),
-                            "is_weekend": 1 if facility.get("is_weekend") else 0,
-                        })
-
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.warning(f"Skipping invalid file {filepath}: {e}")
-            continue
+        return _empty_pool_df()
 
-    if not records:
-        return pd.DataFrame()
+    if since:
+        json_files = _files_since(json_files, since)
 
-    df = pd.DataFrame(records)
+    columns = _parse_files(
+        partial(_parse_pool_file, since=since, aliases_by_type=group_aliases_by_type(aliases)),
+        json_files,
+        POOL_COLUMNS,
+    )
+    if not columns["timestamp"]:
+        return _empty_pool_df()
+
+    df = pd.DataFrame(columns)
+    df[FLAG_COLUMNS] = df[FLAG_COLUMNS].astype("int8")
+    # Downcast only succeeds without gaps; a scrape missing hour stays float
+    for col in SMALL_INT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    df[CATEGORY_COLUMNS] = df[CATEGORY_COLUMNS].astype("category")
     # Parse via UTC to handle mixed offsets (e.g. CET +01:00 / CEST +02:00 around DST switch)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, format="ISO8601")
     # Convert to Berlin local time, then make timezone-naive for consistent matching
     df["timestamp"] = df["timestamp"].dt.tz_convert("Europe/Berlin").dt.tz_localize(None)
     return df
@@ -148,30 +308,12 @@ def load_weather_data(input_dir: Path) -> pd.DataFrame:
         logger.warning(f"No weather files found in {input_dir}")
         return pd.DataFrame()
 
-    records = []
-    for filepath in json_files:
-        try:
-            with open(filepath, encoding="utf-8") as f:
-                data = json.load(f)
-
-            for hour_data in data.get("hourly", []):
-                records.append({
-                    "weather_hour": hour_data.get("timestamp"),
-                    "temperature_c": hour_data.get("temperature_c"),
-                    "precipitation_mm": hour_data.get("precipitation_mm"),
-                    "weather_code": hour_data.get("weather_code"),
-                    "cloud_cover_percent": hour_data.get("cloud_cover_percent"),
-                })
-
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.warning(f"Skipping invalid weather file {filepath}: {e}")
-            continue
-
-    if not records:
+    columns = _parse_files(_parse_weather_file, json_files, WEATHER_COLUMNS)
+    if not columns["weather_hour"]:
         return pd.DataFrame()
 
-    df = pd.DataFrame(records)
-    df["weather_hour"] = pd.to_datetime(df["weather_hour"], utc=True)
+    df = pd.DataFrame(columns)
+    df["weather_hour"] = pd.to_datetime(df["weather_hour"], utc=True, format="ISO8601")
     # Convert to Berlin time and make timezone-naive for easier matching
     df["weather_hour"] = df["weather_hour"].dt.tz_convert("Europe/Berlin").dt.tz_localize(None)
     # Remove duplicates, keeping the most recent data
@@ -180,36 +322,6 @@ def load_weather_data(input_dir: Path) -> pd.DataFrame:
     return df
 
 
-def align_weather(pool_timestamp, weather_df: pd.DataFrame) -> dict:
-    """Get weather data for the hour containing pool_timestamp.
-
-    Args:
-        pool_timestamp: Pool record timestamp (datetime or pandas Timestamp)
-        weather_df: Weather DataFrame indexed by hour
-
-    Returns:
-        Dictionary with weather columns, or empty dict if not found
-    """
-    if weather_df.empty:
-        return {}
-
-    # Convert to pandas Timestamp if needed and truncate to hour
-    ts = pd.Timestamp(pool_timestamp)
-    hour_start = ts.floor("h")
-
-    # Make timezone-naive if needed
-    if hour_start.tz is not None:
-        hour_start = hour_start.tz_localize(None)
-
-    try:
-        if hour_start in weather_df.index:
-            return weather_df.loc[hour_start].to_dict()
-    except (KeyError, TypeError):
-        pass
-
-    return {}
-
-
 def merge_features(
     pool_df: pd.DataFrame,
     weather_df: pd.DataFrame,
@@ -231,30 +343,36 @@ def merge_features(
         return pd.DataFrame()
 
     # Add month column
-    pool_df["month"] = pool_df["timestamp"].dt.month
+    pool_df["month"] = pool_df["timestamp"].dt.month.astype("int8")
 
-    # Add holiday features
-    pool_df["is_holiday"] = pool_df["timestamp"].apply(
-        lambda ts: 1 if is_public_holiday(ts, public_holidays) else 0
-    )
-    pool_df["is_school_vacation"] = pool_df["timestamp"].apply(
-        lambda ts: 1 if is_school_vacation(ts, school_vacations) else 0
-    )
+    # Add holiday features: one array membership test per flag over the
+    # readings' (naive, Berlin-local) calendar days
+    days = pool_df["timestamp"].to_numpy().astype("datetime64[D]")
+    holiday_days = np.array(sorted(public_holidays), dtype="datetime64[D]")
+    pool_df["is_holiday"] = np.isin(days, holiday_days).astype("int8")
+    pool_df["is_school_vacation"] = school_vacation_mask(days, school_vacations).astype("int8")
 
     # Add weather features
     weather_cols = ["temperature_c", "precipitation_mm", "weather_code", "cloud_cover_percent"]
 
-    for col in weather_cols:
-        pool_df[col] = None
-
-    if not weather_df.empty:
-        for idx, row in pool_df.iterrows():
-            weather = align_weather(row["timestamp"], weather_df)
-            for col in weather_cols:
-                if col in weather:
-                    pool_df.at[idx, col] = weather[col]
-
-    return pool_df
+    if weather_df.empty:
+        # Float NaN rather than None so the columns are not object dtype
+        values = np.full((len(pool_df), len(weather_cols)), np.nan)
+    else:
+        # One batched hash lookup of the hour containing each reading against
+        # the (unique) weather index; -1 marks hours without weather, which
+        # become NaN. Values are floats (weather_code is written as "3.0").
+        # Both sides are keyed as int64 epoch seconds, so the lookup hashes
+        # plain integers; the datetime64[h] cast floors readings to the hour.
+        weather = weather_df.reindex(columns=weather_cols).to_numpy(dtype=np.float64)
+        weather_keys = pd.Index(weather_df.index.to_numpy().astype("datetime64[s]").view("int64"))
+        hour_keys = pool_df["timestamp"].to_numpy().astype("datetime64[h]").astype("datetime64[s]")
+        positions = weather_keys.get_indexer(hour_keys.view("int64"))
+        values = weather[positions]
+        values[positions < 0] = np.nan
+
+    # Add all four typed columns in one step rather than one insert each
+    return pool_df.assign(**dict(zip(weather_cols, values.T)))
 
 
 def validate_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -283,7 +401,7 @@ def validate_data(df: pd.DataFrame) -> pd.DataFrame:
         ]
 
     # Check for duplicates (include facility_type since same name can be pool and sauna)
-    duplicates = df.duplicated(subset=["timestamp", "facility_name", "facility_type"], keep="first")
+    duplicates = df.duplicated(subset=RECORD_KEYS, keep="first")
     if duplicates.any():
         logger.warning(f"Removing {duplicates.sum()} duplicate records")
         df = df[~duplicates]
@@ -291,6 +409,31 @@ def validate_data(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def drop_adjacent_duplicates(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Drop rows whose keys equal the next row's, keeping the last of each run.
+
+    On a frame sorted by *keys* this matches
+    ``drop_duplicates(subset=keys, keep="last")`` with a single comparison
+    pass instead of a hash table.
+
+    Args:
+        df: DataFrame sorted by keys
+        keys: Columns identifying a record
+
+    Returns:
+        DataFrame without the earlier rows of each duplicate run
+    """
+    if len(df) < 2:
+        return df
+    same_as_next = np.ones(len(df) - 1, dtype=bool)
+    for key in keys:
+        values = df[key].to_numpy()
+        same_as_next &= values[:-1] == values[1:]
+    if not same_as_next.any():
+        return df
+    return df[np.append(~same_as_next, True)]
+
+
 def apply_opening_hours_overlay(df: pd.DataFrame, schedules: dict) -> pd.DataFrame:
     """Overwrite ``is_open`` and ``occupancy_percent`` on closed hours.
 
@@ -340,16 +483,20 @@ def load_existing_data(output_path: Path) -> pd.DataFrame:
     """Load existing output file if it exists.
 
     Args:
-        output_path: Path to the output CSV file
+        output_path: Path to the output CSV (or .parquet) file
 
     Returns:
         Existing DataFrame or empty DataFrame
     """
     if output_path.exists():
         logger.info(f"Loading existing data from {output_path}")
-        df = pd.read_csv(output_path)
-        # Parse via UTC to handle mixed offsets (CET/CEST) in historical data
-        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+        if output_path.suffix == ".parquet":
+            # Timestamps come back zone-aware; requires pyarrow
+            df = pd.read_parquet(output_path)
+        else:
+            df = pd.read_csv(output_path)
+            # Parse via UTC to handle mixed offsets (CET/CEST) in historical data
+            df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, format="ISO8601")
         # Convert to Berlin local time, then strip timezone for internal processing
         df["timestamp"] = df["timestamp"].dt.tz_convert("Europe/Berlin").dt.tz_localize(None)
         # Handle migration from old column name
@@ -372,7 +519,7 @@ def transform(
         pool_dir: Directory with pool JSON files
         weather_dir: Directory with weather JSON files
         holiday_dir: Directory with holiday JSON files
-        output_path: Path for output CSV file
+        output_path: Path for output CSV file (a .parquet path writes Parquet)
         opening_hours_dir: Directory with facility_opening_*.json snapshots
             (defaults to <repo>/facility_openings_raw)
     """
@@ -436,25 +583,22 @@ def transform(
     logger.info("Validating data...")
     validated_df = validate_data(merged_df)
 
-    # Combine with existing data
+    # Combine with existing data, sorted for output. The stable sort puts
+    # repeated readings next to each other with the new one last, so one
+    # linear pass drops the stale copies.
     if not existing_df.empty:
         combined_df = pd.concat([existing_df, validated_df], ignore_index=True)
-        # Remove any duplicates that might have crept in
-        combined_df = combined_df.drop_duplicates(
-            subset=["timestamp", "facility_name", "facility_type"],
-            keep="last"
-        )
     else:
         combined_df = validated_df
+    combined_df = combined_df.sort_values(RECORD_KEYS, kind="stable")
+    combined_df = drop_adjacent_duplicates(combined_df, RECORD_KEYS)
 
     # Apply opening-hours overlay across the whole frame so backlog rows get
     # corrected too (the overlay is idempotent). The scraper's is_open is
     # unreliable; the published schedule wins.
     combined_df = apply_opening_hours_overlay(combined_df, opening_schedules)
 
-    # Sort and save
-    combined_df = combined_df.sort_values(["timestamp", "facility_name"])
-
+    # Save
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -480,13 +624,12 @@ def transform(
         combined_df["timestamp"] = combined_df["timestamp"].dt.tz_localize(
             TIMEZONE, ambiguous="infer", nonexistent="shift_forward"
         )
-    combined_df["timestamp"] = combined_df["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S%z")
-    # Insert colon in timezone offset for ISO 8601 compliance (+0100 -> +01:00)
-    combined_df["timestamp"] = combined_df["timestamp"].str.replace(
-        r"(\+|-)(\d{2})(\d{2})$", r"\1\2:\3", regex=True
-    )
-
-    combined_df.to_csv(output_path, index=False)
+    if output_path.suffix == ".parquet":
+        # Parquet stores the zone-aware timestamps as-is; requires pyarrow
+        combined_df.to_parquet(output_path, index=False, compression="zstd")
+    else:
+        combined_df["timestamp"] = format_iso_timestamps(combined_df["timestamp"])
+        combined_df.to_csv(output_path, index=False)
     logger.info(f"Saved {len(combined_df)} records to {output_path}")
 
     # Generate facility_types.json mapping
@@ -505,6 +648,12 @@ def transform(
 
 
 def main():
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     parser = argparse.ArgumentParser(description="Transform pool data with weather and holiday features")
     parser.add_argument(
         "--pool-dir",
@@ -528,7 +677,7 @@ def main():
         "--output",
         type=str,
         default="datasets/occupancy_historical.csv",
-        help="Output CSV file path"
+        help="Output CSV file path (.parquet writes Parquet; needs pyarrow)"
     )
     parser.add_argument(
         "--opening-hours-dir",